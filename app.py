@@ -1,15 +1,37 @@
+import argparse
+import csv
+import json
+import math
+import shlex
+import sqlite3
+import sys
 from datetime import datetime
-from db import init_db, add_expense, list_expenses_for_month, delete_expense
-from reports import monthly_total, category_breakdown, generate_category_pie_chart, generate_daily_line_chart
+from db import init_db, add_expense, add_expenses, list_expenses_for_month
+from db import iter_expenses_for_month, iter_expenses_for_range
+from db import delete_expense, reuse_connection
+from db import archive_year, restore_year, list_archived_years
+from db import load_exchange_rates
+from backup import create_snapshot, list_snapshots, restore_snapshot
+from maintenance import run_maintenance, summarize_steps
+from reports import monthly_total, category_breakdown, combined_category_breakdown, daily_totals
+from reports import income_vs_spend, income_vs_spend_range
+from reports import save_category_pie, save_daily_line, save_income_bar
 
+# Exit codes for scripted use
+EXIT_OK = 0
+EXIT_ERROR = 1   # bad data / failed command
+EXIT_USAGE = 2   # bad arguments (argparse uses 2 as well)
 
 def money_to_cents(amount_str: str) -> int:
     # Converts "12.50" -> 1250 cents
     amount_str = amount_str.strip()
     dollars = float(amount_str)
-    if dollars <= 0:
-        raise ValueError("Amount must be > 0")
-    return int(round(dollars * 100))
+    if not math.isfinite(dollars * 100):  # also catches 1e308, which overflows as cents
+        raise ValueError("Amount must be a number")
+    cents = int(round(dollars * 100))
+    if cents <= 0:
+        raise ValueError("Amount must be at least 0.01")
+    return cents
 
 
 def ask_month() -> str:
@@ -32,12 +54,12 @@ def print_expenses(rows):
     print("\nID | Date       | Category        | Amount   | Note")
     print("-" * 60)
     for r in rows:
-        amount = r["amount_cents"] / 100
-        note = r["note"] or ""
-        print(f'{r["id"]:>2} | {r["expense_date"]} | {r["category"]:<14} | ${amount:>7.2f} | {note}')
+        note = r.note or ""
+        amount = f"{r.amount} {r.currency}" if r.currency else f"${r.amount}"
+        print(f'{r.id:>2} | {r.expense_date} | {r.category:<14} | {amount:>8} | {note}')
 
 
-def main():
+def menu():
     init_db()
 
     while True:
@@ -47,6 +69,11 @@ def main():
         print("3) List expenses for a month")
         print("4) Delete expense by ID")
         print("5) Generate charts for a month")
+        print("6) Archive a closed year")
+        print("7) Restore an archived year")
+        print("8) Back up now")
+        print("9) Restore from a backup")
+        print("10) Run database maintenance")
         print("0) Exit")
 
         choice = input("Choose: ").strip()
@@ -94,8 +121,8 @@ def main():
 
             elif choice == "5":
                 month = ask_month()
-                pie = generate_category_pie_chart(month)
-                line = generate_daily_line_chart(month)
+                pie = save_category_pie(month)
+                line = save_daily_line(month)
 
                 if not pie and not line:
                     print("No data for that month, no charts generated.")
@@ -105,6 +132,42 @@ def main():
                     if line:
                         print(f"📈 Saved: {line}")
 
+            elif choice == "6":
+                archived = list_archived_years()
+                if archived:
+                    print("Archived: " + ", ".join(f"{y} ({n} expenses)" for y, n in archived))
+                year = int(input("Year to archive (YYYY): ").strip())
+                moved = archive_year(year)
+                print(f"📦 Archived {moved} expenses from {year}.")
+
+            elif choice == "7":
+                year = int(input("Year to restore (YYYY): ").strip())
+                restored = restore_year(year)
+                print(f"📂 Restored {restored} expenses from {year}.")
+
+            elif choice == "8":
+                path = create_snapshot(compress=True)
+                print(f"💾 Backup saved: {path}")
+
+            elif choice == "9":
+                snapshots = list_snapshots()
+                if not snapshots:
+                    print("No backups found.")
+                    continue
+                for i, path in enumerate(snapshots, start=1):
+                    print(f"{i}) {path.name}")
+                pick = int(input("Backup to restore: ").strip())
+                if not 1 <= pick <= len(snapshots):
+                    raise ValueError("No backup with that number")
+                restore_snapshot(snapshots[pick - 1])
+                print("✅ Restored.")
+
+            elif choice == "10":
+                steps, seconds, freed = run_maintenance()
+                for line in summarize_steps(steps):
+                    print(f"- {line}")
+                print(f"🧹 Maintenance done in {seconds * 1000:.0f} ms, freed {freed} bytes.")
+
             elif choice == "0":
                 print("Goodbye!")
                 break
@@ -116,5 +179,340 @@ def main():
             print(f"❌ Input error: {e}")
 
 
+# ---------------- Scriptable CLI ----------------
+
+def _matches_format(value: str, fmt: str) -> bool:
+    # strptime alone accepts "2024-3", which matches no stored month
+    try:
+        return datetime.strptime(value, fmt).strftime(fmt) == value
+    except ValueError:
+        return False
+
+
+def month_arg(value: str) -> str:
+    if not _matches_format(value, "%Y-%m"):
+        raise argparse.ArgumentTypeError(f"invalid month {value!r}, expected YYYY-MM")
+    return value
+
+
+def date_arg(value: str) -> str:
+    if not _matches_format(value, "%Y-%m-%d"):
+        raise argparse.ArgumentTypeError(f"invalid date {value!r}, expected YYYY-MM-DD")
+    return value
+
+
+def money_arg(value: str) -> int:
+    try:
+        return money_to_cents(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"invalid amount {value!r}: {e}")
+
+
+def money_str(cents: int) -> str:
+    return f"{cents / 100:.2f}"
+
+
+def expense_record(r) -> dict:
+    return {
+        "id": r.id,
+        "date": r.expense_date,
+        "category": r.category,
+        "amount_cents": r.amount_cents,
+        "amount": r.amount,
+        "currency": r.currency or "",
+        "base_amount_cents": r.base_amount_cents,
+        "note": r.note or "",
+    }
+
+
+def category_records(pairs) -> list:
+    return [{"category": c, "amount_cents": v, "amount": money_str(v)} for c, v in pairs]
+
+
+# Each command returns a dict (one record) or a list/iterator of dicts (a table)
+
+def cmd_add(args):
+    category = args.category.strip()
+    if not category:
+        raise ValueError("Category cannot be empty.")
+    expense_id = add_expense(args.amount, category, args.date, args.note, args.currency)
+    return {"id": expense_id}
+
+
+def cmd_delete(args):
+    if not delete_expense(args.id):
+        raise ValueError(f"No expense found with ID {args.id}")
+    return {"deleted": args.id}
+
+
+def cmd_list(args):
+    return map(expense_record, iter_expenses_for_month(args.month, converted=True))
+
+
+def cmd_summary(args):
+    return income_vs_spend(args.month)._asdict()
+
+
+def cmd_breakdown(args):
+    if args.combined:
+        return category_records(combined_category_breakdown(args.month))
+    return category_records(category_breakdown(args.month))
+
+
+def cmd_trend(args):
+    if args.month:
+        return [{"date": d, "amount_cents": v, "amount": money_str(v)} for d, v in daily_totals(args.month)]
+
+    return [snapshot._asdict() for snapshot in income_vs_spend_range(args.start, args.end)]
+
+
+def cmd_charts(args):
+    charts = {
+        "category_pie": save_category_pie(args.month),
+        "daily_line": save_daily_line(args.month),
+        "income_bar": save_income_bar(args.month),
+    }
+    return [{"chart": name, "path": str(path)} for name, path in charts.items() if path]
+
+
+def cmd_import(args):
+    # CSV with a header: date,category,amount[,note][,currency]; amount in
+    # dollars (or units of currency), blank currency = base currency
+    f = sys.stdin if args.file == "-" else open(args.file, newline="", encoding="utf-8")
+    try:
+        rows = []
+        for line_no, r in enumerate(csv.DictReader(f), start=2):
+            try:
+                category = (r.get("category") or "").strip()
+                if not category:
+                    raise ValueError("category is empty")
+                rows.append((
+                    money_to_cents(r["amount"]),
+                    category,
+                    date_arg(r["date"].strip()),
+                    (r.get("note") or "").strip() or None,
+                    (r.get("currency") or "").strip() or None,
+                ))
+            except (KeyError, ValueError, argparse.ArgumentTypeError) as e:
+                raise ValueError(f"line {line_no}: {e}")
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+    if args.dry_run:
+        return {"valid": len(rows), "imported": 0}
+    return {"imported": add_expenses(rows)}
+
+
+def cmd_export(args):
+    if args.month:
+        rows = iter_expenses_for_month(args.month, converted=True)
+    else:
+        rows = iter_expenses_for_range(args.start, args.end, converted=True)
+    return map(expense_record, rows)
+
+
+def cmd_backup(args):
+    return {"snapshot": str(create_snapshot(compress=not args.no_compress))}
+
+
+def cmd_maintain(args):
+    steps, seconds, freed = run_maintenance()
+    return {"seconds": round(seconds, 3), "freed_bytes": freed, "steps": summarize_steps(steps)}
+
+
+def cmd_archive(args):
+    return {"year": args.year, "archived": archive_year(args.year)}
+
+
+def cmd_rates(args):
+    return [{"file": path, "rates": load_exchange_rates(path)} for path in args.files]
+
+
+# ---------------- Output ----------------
+
+def write_output(result, fmt: str, out):
+    # Tables are streamed row by row for json/csv, so large exports never
+    # sit in memory as one list.
+    records = iter([result]) if isinstance(result, dict) else iter(result)
+
+    if fmt == "json":
+        if isinstance(result, dict):
+            out.write(json.dumps(result) + "\n")
+            return
+        # the first record is fetched before anything is written, so a
+        # query that fails up front leaves no dangling "[" on stdout
+        first = next(records, None)
+        if first is None:
+            out.write("[]\n")
+            return
+        out.write("[" + json.dumps(first))
+        for record in records:
+            out.write(", " + json.dumps(record))
+        out.write("]\n")
+        return
+
+    if fmt == "csv":
+        first = next(records, None)
+        if first is not None:
+            writer = csv.DictWriter(out, fieldnames=list(first), lineterminator="\n")
+            writer.writeheader()
+            writer.writerow(first)
+            writer.writerows(records)
+        return
+
+    # table: plain aligned text for humans (needs every row for the widths)
+    records = list(records)
+    if not records:
+        out.write("(no rows)\n")
+        return
+    cols = list(records[0])
+    widths = {c: max(len(c), *(len(str(r[c])) for r in records)) for c in cols}
+    out.write("  ".join(c.ljust(widths[c]) for c in cols).rstrip() + "\n")
+    for r in records:
+        out.write("  ".join(str(r[c]).ljust(widths[c]) for c in cols).rstrip() + "\n")
+
+
+# ---------------- Parser ----------------
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="app.py",
+        description="Expense Tracker. Run without arguments for the interactive menu.",
+    )
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--format", choices=("table", "json", "csv"), default=None,
+                        help="output format (default: table)")
+
+    sub = parser.add_subparsers(dest="command", metavar="COMMAND")
+
+    def add_cmd(name, func, help_text):
+        p = sub.add_parser(name, parents=[common], help=help_text, description=help_text)
+        p.set_defaults(func=func)
+        return p
+
+    def add_range(p, month_help):
+        group = p.add_mutually_exclusive_group(required=True)
+        group.add_argument("--month", type=month_arg, help=month_help)
+        group.add_argument("--from", dest="start", type=month_arg, help="first month of a range")
+        p.add_argument("--to", dest="end", type=month_arg, help="last month of a range (with --from)")
+
+    p = add_cmd("add", cmd_add, "add an expense")
+    p.add_argument("--amount", type=money_arg, required=True, help="amount in dollars, e.g. 12.50")
+    p.add_argument("--category", required=True)
+    p.add_argument("--date", type=date_arg, default=datetime.now().strftime("%Y-%m-%d"),
+                   help="YYYY-MM-DD (default: today)")
+    p.add_argument("--note", default=None)
+    p.add_argument("--currency", default=None, help="3-letter code (default: base currency)")
+
+    p = add_cmd("delete", cmd_delete, "delete an expense by ID")
+    p.add_argument("id", type=int)
+
+    p = add_cmd("list", cmd_list, "list a month's expenses")
+    p.add_argument("--month", type=month_arg, required=True)
+
+    p = add_cmd("summary", cmd_summary, "income, fixed, variable and net for a month")
+    p.add_argument("--month", type=month_arg, required=True)
+
+    p = add_cmd("breakdown", cmd_breakdown, "spending by category for a month")
+    p.add_argument("--month", type=month_arg, required=True)
+    p.add_argument("--combined", action="store_true", help="include fixed expenses")
+
+    p = add_cmd("trend", cmd_trend, "daily totals for a month, or monthly totals for a range")
+    add_range(p, "daily totals for this month")
+
+    p = add_cmd("charts", cmd_charts, "save chart images for a month")
+    p.add_argument("--month", type=month_arg, required=True)
+
+    p = add_cmd("import", cmd_import, "import expenses from CSV (date,category,amount[,note][,currency])")
+    p.add_argument("file", help="CSV file, or - for stdin")
+    p.add_argument("--dry-run", action="store_true", help="validate only")
+
+    p = add_cmd("export", cmd_export, "export expenses for a month or range")
+    add_range(p, "export this month")
+
+    p = add_cmd("backup", cmd_backup, "take a backup snapshot")
+    p.add_argument("--no-compress", action="store_true")
+
+    add_cmd("maintain", cmd_maintain, "run database maintenance")
+
+    p = add_cmd("archive", cmd_archive, "archive a closed year")
+    p.add_argument("year", type=int)
+
+    p = add_cmd("rates", cmd_rates, "load exchange rates from CSV (date,currency,rate)")
+    p.add_argument("files", nargs="+", help="rate is the value of one unit in the base currency")
+
+    p = add_cmd("batch", None, "run many commands from stdin, one per line, in one process")
+    p.add_argument("--stop-on-error", action="store_true", help="stop at the first failing command")
+
+    return parser
+
+
+def run_command(parser, argv, out, default_format="table") -> int:
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        return EXIT_OK if e.code == 0 else EXIT_USAGE
+
+    if args.command is None:
+        parser.print_usage(sys.stderr)
+        return EXIT_USAGE
+    if args.command == "batch":
+        print("batch cannot be nested", file=sys.stderr)
+        return EXIT_USAGE
+    if getattr(args, "start", None) and not getattr(args, "end", None):
+        args.end = args.start
+    if getattr(args, "start", None) and args.end < args.start:
+        print("--to cannot be earlier than --from", file=sys.stderr)
+        return EXIT_USAGE
+
+    try:
+        result = args.func(args)
+        write_output(result, args.format or default_format, out)
+    except (ValueError, OverflowError, OSError, sqlite3.Error) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    return EXIT_OK
+
+
+def run_batch(parser, lines, out, default_format="table", stop_on_error=False) -> int:
+    # One process, one connection for the whole batch; exit code is the
+    # first failure's (or 0 if every command succeeded).
+    status = EXIT_OK
+    with reuse_connection():
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                argv = shlex.split(line)
+            except ValueError as e:  # e.g. an unbalanced quote
+                print(f"error: {e}: {line}", file=sys.stderr)
+                code = EXIT_USAGE
+            else:
+                code = run_command(parser, argv, out, default_format)
+            out.flush()
+            if code != EXIT_OK:
+                status = status or code
+                if stop_on_error:
+                    break
+    return status
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        menu()
+        return EXIT_OK
+
+    parser = build_parser()
+    init_db()
+
+    if argv[0] == "batch":
+        args = parser.parse_args(argv)
+        return run_batch(parser, sys.stdin, sys.stdout, args.format or "table", args.stop_on_error)
+    return run_command(parser, argv, sys.stdout)
+
+
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
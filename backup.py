@@ -0,0 +1,175 @@
+import gzip
+import shutil
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from db import APP_DIR, ARCHIVE_DIR, DB_FILE, init_db, _rate_cache
+
+BACKUPS_DIR = APP_DIR / "backups"
+
+# The backup API copies this many pages per step and sleeps between steps,
+# so a writer (add_expense, ...) is only ever locked out for one short step.
+BACKUP_PAGES_PER_STEP = 64
+BACKUP_STEP_SLEEP = 0.005  # seconds
+
+DEFAULT_KEEP_SNAPSHOTS = 7
+DEFAULT_SNAPSHOT_INTERVAL = timedelta(hours=24)
+
+SNAPSHOT_PREFIX = "snapshot_"
+SNAPSHOT_TIME_FORMAT = "%Y%m%d_%H%M%S"
+
+# progress(status, remaining_pages, total_pages) as in sqlite3.Connection.backup
+Progress = Optional[Callable[[int, int, int], None]]
+
+
+def _backup_file(src_path: Path, dest_path: Path, progress: Progress = None):
+    # Online, paged copy of one database file using the SQLite backup API
+    src = sqlite3.connect(src_path)
+    dest = sqlite3.connect(dest_path)
+    try:
+        src.backup(dest, pages=BACKUP_PAGES_PER_STEP, progress=progress, sleep=BACKUP_STEP_SLEEP)
+    finally:
+        dest.close()
+        src.close()
+
+
+def _gzip_file(path: Path) -> Path:
+    out = path.with_name(path.name + ".gz")
+    with open(path, "rb") as f_in, gzip.open(out, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    path.unlink()
+    return out
+
+
+def _gunzip_file(path: Path, dest_path: Path):
+    with gzip.open(path, "rb") as f_in, open(dest_path, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out)
+
+
+def _snapshot_time(path: Path) -> Optional[datetime]:
+    try:
+        return datetime.strptime(path.name[len(SNAPSHOT_PREFIX):], SNAPSHOT_TIME_FORMAT)
+    except ValueError:
+        return None
+
+
+def list_snapshots() -> List[Path]:
+    # Completed snapshots, newest first
+    if not BACKUPS_DIR.exists():
+        return []
+    snapshots = [
+        p for p in BACKUPS_DIR.iterdir()
+        if p.is_dir() and p.name.startswith(SNAPSHOT_PREFIX) and _snapshot_time(p)
+    ]
+    return sorted(snapshots, key=lambda p: p.name, reverse=True)
+
+
+def create_snapshot(compress: bool = False, progress: Progress = None) -> Path:
+    # Snapshot = expenses.db plus every archive partition, in its own folder.
+    # Written under a temporary name and renamed once complete.
+    BACKUPS_DIR.mkdir(parents=True, exist_ok=True)
+    name = SNAPSHOT_PREFIX + datetime.now().strftime(SNAPSHOT_TIME_FORMAT)
+    partial = BACKUPS_DIR / (name + ".partial")
+    final = BACKUPS_DIR / name
+    if final.exists():
+        raise ValueError(f"A snapshot named {name} already exists.")
+
+    shutil.rmtree(partial, ignore_errors=True)
+    (partial / "archive").mkdir(parents=True)
+
+    try:
+        files = [(DB_FILE, partial / DB_FILE.name)]
+        if ARCHIVE_DIR.exists():
+            files += [(p, partial / "archive" / p.name) for p in sorted(ARCHIVE_DIR.glob("*.db"))]
+
+        for src, dest in files:
+            _backup_file(src, dest, progress)
+            if compress:
+                _gzip_file(dest)
+    except Exception:
+        shutil.rmtree(partial, ignore_errors=True)
+        raise
+
+    partial.rename(final)
+    return final
+
+
+def prune_snapshots(keep: int = DEFAULT_KEEP_SNAPSHOTS) -> List[Path]:
+    removed = list_snapshots()[keep:]
+    for path in removed:
+        shutil.rmtree(path, ignore_errors=True)
+    return removed
+
+
+def snapshot_due(interval: timedelta = DEFAULT_SNAPSHOT_INTERVAL) -> bool:
+    snapshots = list_snapshots()
+    if not snapshots:
+        return True
+    return datetime.now() - _snapshot_time(snapshots[0]) >= interval
+
+
+def run_scheduled_snapshot(interval: timedelta = DEFAULT_SNAPSHOT_INTERVAL,
+                           keep: int = DEFAULT_KEEP_SNAPSHOTS,
+                           compress: bool = True) -> Optional[Path]:
+    # Takes a snapshot only if the newest one is older than interval
+    if not snapshot_due(interval):
+        return None
+    path = create_snapshot(compress=compress)
+    prune_snapshots(keep)
+    return path
+
+
+def _integrity_check(path: Path):
+    conn = sqlite3.connect(path)
+    try:
+        rows = conn.execute("PRAGMA integrity_check;").fetchall()
+    finally:
+        conn.close()
+    if [r[0] for r in rows] != ["ok"]:
+        raise ValueError(f"{path.name} failed integrity check: {rows[0][0]}")
+
+
+def restore_snapshot(snapshot: Path, progress: Progress = None):
+    # Every file is verified before anything live is touched
+    snapshot = Path(snapshot)
+    sources = [p for p in snapshot.glob("*.db*")] + [p for p in (snapshot / "archive").glob("*.db*")]
+    if not any(p.name.startswith(DB_FILE.name) for p in sources):
+        raise ValueError(f"{snapshot} does not contain {DB_FILE.name}.")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        staged = []
+        for src in sources:
+            name = src.name[:-3] if src.suffix == ".gz" else src.name
+            plain = Path(tmp) / (("archive_" if src.parent.name == "archive" else "") + name)
+            if src.suffix == ".gz":
+                _gunzip_file(src, plain)
+            else:
+                shutil.copyfile(src, plain)
+            _integrity_check(plain)
+
+            dest = ARCHIVE_DIR / name if src.parent.name == "archive" else DB_FILE
+            staged.append((plain, dest))
+
+        # Copy into the live files through the backup API, so open
+        # connections see a consistent database rather than a swapped file.
+        # Partitions go first and expenses.db (whose archive_months points
+        # at them) last; partitions the snapshot doesn't have are only
+        # removed once every copy succeeded, so a failed restore never
+        # leaves archive_months pointing at deleted files.
+        ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+        staged.sort(key=lambda item: item[1] == DB_FILE)
+        for plain, dest in staged:
+            _backup_file(plain, dest, progress)
+
+        restored_partitions = {dest for _, dest in staged if dest != DB_FILE}
+        for path in ARCHIVE_DIR.glob("*.db"):
+            if path not in restored_partitions:
+                path.unlink()
+
+    # An older snapshot may predate tables and columns this version uses;
+    # cached rates belong to the data that was just replaced.
+    init_db()
+    _rate_cache.clear()
@@ -0,0 +1,80 @@
+from bisect import bisect_left, insort
+from heapq import nlargest
+from typing import Dict, Iterable, List, Tuple
+
+# Suggestions cached per typed prefix; cleared on every change
+PREFIX_CACHE_SIZE = 512
+
+
+class CategoryIndex:
+    # In-memory prefix index over category names, ranked by usage.
+    #
+    # Keys are case-folded and kept in one sorted list, so every category
+    # starting with a prefix is the slice between two bisects. Each key
+    # remembers how often each spelling was used ("food" vs "Food") and
+    # suggests the most common one.
+
+    def __init__(self, counts: Iterable[Tuple[str, int]] = ()):
+        self.reset(counts)
+
+    def reset(self, counts: Iterable[Tuple[str, int]]):
+        # Reloads from fresh usage counts (e.g. after bulk edits)
+        self._keys: List[str] = []
+        self._totals: Dict[str, int] = {}
+        self._spellings: Dict[str, Dict[str, int]] = {}
+        self._cache: Dict[Tuple[str, int], List[str]] = {}
+        for category, n in counts:
+            self._add(category, n)
+        self._keys.sort()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _add(self, category: str, n: int):
+        # Caller keeps _keys sorted (bulk load sorts once at the end)
+        category = category.strip()
+        if not category:
+            return
+        key = category.casefold()
+        if key not in self._totals:
+            self._keys.append(key)
+            self._totals[key] = 0
+            self._spellings[key] = {}
+        self._totals[key] += n
+        spellings = self._spellings[key]
+        spellings[category] = spellings.get(category, 0) + n
+
+    def add(self, category: str, n: int = 1):
+        # Record n more uses of category (e.g. right after add_expense)
+        key = category.strip().casefold()
+        if key and key not in self._totals:
+            insort(self._keys, key)
+            self._totals[key] = 0
+            self._spellings[key] = {}
+        self._add(category, n)
+        self._cache.clear()
+
+    def display_name(self, key: str) -> str:
+        spellings = self._spellings[key]
+        return max(spellings, key=spellings.get)
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[str]:
+        # Most used categories starting with prefix (case-insensitive)
+        prefix = prefix.strip().casefold()
+        cached = self._cache.get((prefix, limit))
+        if cached is not None:
+            return cached
+
+        lo = bisect_left(self._keys, prefix)
+        hi = bisect_left(self._keys, prefix + "\U0010ffff", lo)
+        keys = self._keys[lo:hi]
+        if len(keys) > limit:
+            keys = nlargest(limit, keys, key=self._totals.__getitem__)
+        else:
+            keys.sort(key=self._totals.__getitem__, reverse=True)
+
+        result = [self.display_name(k) for k in keys]
+        if len(self._cache) >= PREFIX_CACHE_SIZE:
+            self._cache.clear()
+        self._cache[(prefix, limit)] = result
+        return result
@@ -1,7 +1,19 @@
+import csv
 import os
+import re
 import sqlite3
+import threading
+from bisect import bisect_right
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, List
+from datetime import date, timedelta
+from typing import Optional, List, Tuple, Dict, Iterator
+
+from models import (
+    Expense, FixedExpense, IncomeEntry,
+    EXPENSE_COLUMNS, FIXED_EXPENSE_COLUMNS,
+    make_expense, make_converted_expense, make_fixed_expense, make_income_entry,
+)
 
 # App data folder (safe for installed apps)
 APP_DIR = Path(os.getenv("APPDATA", ".")) / "ExpenseTracker"
@@ -9,26 +21,79 @@ APP_DIR.mkdir(parents=True, exist_ok=True)
 
 DB_FILE = APP_DIR / "expenses.db"
 
+# Closed years moved out of expenses.db live here, one file per year
+ARCHIVE_DIR = APP_DIR / "archive"
+
+
+# Connection shared by every get_connection() call on a thread while
+# reuse_connection() is active (CLI batches, server workers).
+_shared = threading.local()
+
+
+def _connect(path=DB_FILE, **kwargs):
+    # Rows come back as plain tuples; callers that hand rows out wrap them
+    # in the typed records from models.py.
+    return sqlite3.connect(path, **kwargs)
+
 
 def get_connection():
-    conn = sqlite3.connect(DB_FILE)
-    conn.row_factory = sqlite3.Row
-    return conn
+    conn = getattr(_shared, "conn", None)
+    if conn is not None:
+        return conn
+    return _connect()
+
+
+@contextmanager
+def reuse_connection(conn=None):
+    # `with get_connection() as conn:` only commits/rolls back, it never
+    # closes, so callers work unchanged on the shared connection.
+    owned = conn is None
+    if owned:
+        conn = _connect()
+    previous = getattr(_shared, "conn", None)
+    _shared.conn = conn
+    try:
+        yield conn
+    finally:
+        _shared.conn = previous
+        if owned:
+            conn.close()
+
+
+def connect_readonly():
+    # Read-only connection usable from any thread (one thread at a time);
+    # with WAL, readers never block writers or each other.
+    return _connect(DB_FILE.resolve().as_uri() + "?mode=ro", uri=True, check_same_thread=False)
+
+
+# Rows fetched per round trip by the streaming iter_* readers
+STREAM_BATCH_ROWS = 500
+
+
+def close_connection(conn):
+    # Closes a connection from get_connection() unless it is the shared one
+    if conn is not getattr(_shared, "conn", None):
+        conn.close()
 
 
 def init_db():
     with get_connection() as conn:
+        # WAL lets readers (reports, backups) run alongside add_expense writes
+        conn.execute("PRAGMA journal_mode=WAL;")
+
         conn.execute("""
             CREATE TABLE IF NOT EXISTS expenses (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 amount_cents INTEGER NOT NULL CHECK(amount_cents > 0),
                 category TEXT NOT NULL,
                 expense_date TEXT NOT NULL,   -- 'YYYY-MM-DD'
-                note TEXT
+                note TEXT,
+                currency TEXT                 -- ISO code, NULL = base currency
             );
         """)
+        _add_column_if_missing(conn, "expenses", "currency", "TEXT")
 
-        # Global settings table (salary stored here)
+        # Global settings table (key/value)
         conn.execute("""
             CREATE TABLE IF NOT EXISTS settings (
                 key TEXT PRIMARY KEY,
@@ -43,32 +108,186 @@ def init_db():
                 category TEXT NOT NULL,
                 start_month TEXT NOT NULL,   -- 'YYYY-MM'
                 end_month TEXT,              -- NULL means no end
-                active INTEGER NOT NULL DEFAULT 1  -- 1 = active, 0 = inactive
+                active INTEGER NOT NULL DEFAULT 1,  -- 1 = active, 0 = inactive
+                interval_unit TEXT NOT NULL DEFAULT 'month',  -- day/week/month/year
+                interval_count INTEGER NOT NULL DEFAULT 1
+            );
+        """)
+        _add_column_if_missing(conn, "fixed_expenses", "interval_unit", "TEXT NOT NULL DEFAULT 'month'")
+        _add_column_if_missing(conn, "fixed_expenses", "interval_count", "INTEGER NOT NULL DEFAULT 1")
+
+        # Expanded occurrences of active fixed expenses, one row per
+        # (month, fixed expense). Kept in sync on every fixed expense change
+        # and extended when the horizon advances.
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS fixed_schedule (
+                month TEXT NOT NULL,          -- 'YYYY-MM'
+                fixed_id INTEGER NOT NULL,
+                category TEXT NOT NULL,
+                occurrences INTEGER NOT NULL,
+                amount_cents INTEGER NOT NULL,  -- occurrences * fixed amount
+                PRIMARY KEY (month, fixed_id)
+            ) WITHOUT ROWID;
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_fixed_schedule_fixed ON fixed_schedule(fixed_id);
+        """)
+
+        # Income history: one row per (source, effective month). A source's
+        # amount applies from its effective month until the next change.
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS income_sources (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL UNIQUE
+            );
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS income_history (
+                source_id INTEGER NOT NULL REFERENCES income_sources(id),
+                effective_month TEXT NOT NULL,   -- 'YYYY-MM'
+                amount_cents INTEGER NOT NULL CHECK(amount_cents >= 0),
+                PRIMARY KEY (source_id, effective_month)
+            ) WITHOUT ROWID;
+        """)
+
+        # Months whose expenses were moved into a per-year partition file
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS archive_months (
+                month TEXT PRIMARY KEY,   -- 'YYYY-MM'
+                expense_count INTEGER NOT NULL,
+                archived_at TEXT NOT NULL
             );
         """)
 
+        # Date-effective rates: 1 unit of currency = rate_to_base base units
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS exchange_rates (
+                currency TEXT NOT NULL,
+                effective_date TEXT NOT NULL,   -- 'YYYY-MM-DD'
+                rate_to_base REAL NOT NULL CHECK(rate_to_base > 0),
+                PRIMARY KEY (currency, effective_date)
+            ) WITHOUT ROWID;
+        """)
+
+        _migrate_partitions(conn)
+        _create_daily_aggregates(conn)
+        _migrate_global_salary(conn)
+        _ensure_schedule_horizon(conn, _default_horizon())
 
         conn.commit()
 
+        _migrate_auto_vacuum(conn)
+
 
-def add_expense(amount_cents: int, category: str, expense_date: str, note: Optional[str]):
+def _migrate_auto_vacuum(conn):
+    # INCREMENTAL lets maintenance give free pages back in small slices.
+    # Changing the mode on an existing file only takes effect after VACUUM.
+    if conn.execute("PRAGMA auto_vacuum;").fetchone()[0] != 2:
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL;")
+        conn.execute("VACUUM;")
+
+
+def _add_column_if_missing(conn, table: str, column: str, decl: str, schema: str = "main"):
+    columns = [r[1] for r in conn.execute(f"PRAGMA {schema}.table_info({table});")]
+    if column not in columns:
+        conn.execute(f"ALTER TABLE {schema}.{table} ADD COLUMN {column} {decl};")
+
+
+def add_expense(amount_cents: int, category: str, expense_date: str, note: Optional[str],
+                currency: Optional[str] = None) -> int:
+    # currency: ISO code; None (or the base currency) stores a base amount
     with get_connection() as conn:
-        conn.execute("""
-            INSERT INTO expenses (amount_cents, category, expense_date, note)
-            VALUES (?, ?, ?, ?);
-        """, (amount_cents, category, expense_date, note))
+        _check_year_not_archived(conn, int(expense_date[:4]))
+        currency = _check_currency(conn, currency)
+        cur = conn.execute("""
+            INSERT INTO expenses (amount_cents, category, expense_date, note, currency)
+            VALUES (?, ?, ?, ?, ?);
+        """, (amount_cents, category, expense_date, note, currency))
         conn.commit()
+        return cur.lastrowid
 
 
-def list_expenses_for_month(month_yyyy_mm: str):
+def add_expenses(rows) -> int:
+    # rows: (amount_cents, category, expense_date, note[, currency]); one transaction
+    rows = [(r[0], r[1], r[2], r[3], r[4] if len(r) > 4 else None) for r in rows]
     with get_connection() as conn:
-        rows = conn.execute("""
-            SELECT id, amount_cents, category, expense_date, note
-            FROM expenses
-            WHERE substr(expense_date, 1, 7) = ?
-            ORDER BY expense_date ASC, id ASC;
-        """, (month_yyyy_mm,)).fetchall()
-    return rows
+        for year in sorted({int(r[2][:4]) for r in rows}):
+            _check_year_not_archived(conn, year)
+        checked = {c: _check_currency(conn, c) for c in {r[4] for r in rows}}
+        rows = [r[:4] + (checked[r[4]],) for r in rows]
+        conn.executemany("""
+            INSERT INTO expenses (amount_cents, category, expense_date, note, currency)
+            VALUES (?, ?, ?, ?, ?);
+        """, rows)
+        conn.commit()
+    return len(rows)
+
+
+def _fetch_records(conn, make, sql: str, params=()) -> Iterator:
+    # Streams rows as records, fetching in batches
+    cur = conn.execute(sql, params)
+    cur.arraysize = STREAM_BATCH_ROWS
+    while True:
+        batch = cur.fetchmany()
+        if not batch:
+            break
+        yield from map(make, batch)
+
+
+def _iter_records(conn, make, sql: str, params=()) -> Iterator:
+    # _fetch_records, releasing the connection when iteration ends (or the
+    # generator is closed)
+    try:
+        yield from _fetch_records(conn, make, sql, params)
+    finally:
+        close_connection(conn)
+
+
+def _expense_select(converted: bool):
+    # Columns and record maker; converted adds base_amount_cents (computed
+    # in the query, see base_amount_sql) for rows read FROM ... AS e
+    if converted:
+        return f"{EXPENSE_COLUMNS}, {base_amount_sql('e')}", make_converted_expense
+    return EXPENSE_COLUMNS, make_expense
+
+
+def iter_expenses_for_month(month_yyyy_mm: str, converted: bool = False) -> Iterator[Expense]:
+    # converted=True yields ConvertedExpense records
+    columns, make = _expense_select(converted)
+    conn = get_connection()
+    table = expenses_table_for_month(conn, month_yyyy_mm)
+    return _iter_records(conn, make, f"""
+        SELECT {columns}
+        FROM {table} AS e
+        WHERE substr(expense_date, 1, 7) = ?
+        ORDER BY expense_date ASC, id ASC;
+    """, (month_yyyy_mm,))
+
+
+def list_expenses_for_month(month_yyyy_mm: str) -> List[Expense]:
+    return list(iter_expenses_for_month(month_yyyy_mm))
+
+
+def iter_expenses_for_range(start_month: str, end_month: str, converted: bool = False) -> Iterator[Expense]:
+    # Read chunk by chunk (see month_range_chunks); chunks are consecutive,
+    # so rows still come out in date order. converted as in iter_expenses_for_month.
+    columns, make = _expense_select(converted)
+    conn = get_connection()
+    try:
+        for first, last in month_range_chunks(conn, start_month, end_month):
+            source = expenses_source_for_range(conn, first, last)
+            yield from _fetch_records(conn, make, f"""
+                SELECT {columns}
+                FROM {source} AS e
+                WHERE expense_date >= ? AND expense_date < date(? || '-01', '+1 month')
+                ORDER BY expense_date ASC, id ASC;
+            """, (first + "-01", last))
+    finally:
+        close_connection(conn)
+
+
+def list_expenses_for_range(start_month: str, end_month: str) -> List[Expense]:
+    return list(iter_expenses_for_range(start_month, end_month))
 
 
 def delete_expense(expense_id: int) -> bool:
@@ -78,62 +297,931 @@ def delete_expense(expense_id: int) -> bool:
         return cur.rowcount > 0
 
 
+# ---------- Bulk edits (one transaction per call) ----------
+
+def _select_ids(conn, ids) -> int:
+    # Loads ids into a temp table so bulk statements are one set-based
+    # join instead of a statement (and a commit) per row.
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS selected_ids (id INTEGER PRIMARY KEY);")
+    conn.execute("DELETE FROM temp.selected_ids;")
+    conn.executemany("INSERT OR IGNORE INTO temp.selected_ids (id) VALUES (?);", ((int(i),) for i in ids))
+    return conn.execute("SELECT COUNT(*) FROM temp.selected_ids;").fetchone()[0]
+
+
+def delete_expenses(ids) -> int:
+    # Returns how many were deleted (rows of archived years are not touched)
+    with get_connection() as conn:
+        _select_ids(conn, ids)
+        cur = conn.execute("DELETE FROM expenses WHERE id IN (SELECT id FROM temp.selected_ids);")
+        conn.commit()
+        return cur.rowcount
+
+
+def recategorize_expenses(ids, category: str) -> int:
+    category = category.strip()
+    if not category:
+        raise ValueError("Category cannot be empty.")
+    with get_connection() as conn:
+        _select_ids(conn, ids)
+        cur = conn.execute("""
+            UPDATE expenses SET category = ?
+            WHERE id IN (SELECT id FROM temp.selected_ids);
+        """, (category,))
+        conn.commit()
+        return cur.rowcount
+
+
+def shift_expense_dates(ids, days: int) -> int:
+    # Moves expenses by a number of days (negative = earlier)
+    modifier = f"{int(days):+d} days"
+    with get_connection() as conn:
+        _select_ids(conn, ids)
+        years = conn.execute("""
+            SELECT DISTINCT CAST(substr(date(expense_date, ?), 1, 4) AS INTEGER)
+            FROM expenses
+            WHERE id IN (SELECT id FROM temp.selected_ids);
+        """, (modifier,)).fetchall()
+        for (year,) in years:
+            _check_year_not_archived(conn, year)
+
+        cur = conn.execute("""
+            UPDATE expenses SET expense_date = date(expense_date, ?)
+            WHERE id IN (SELECT id FROM temp.selected_ids);
+        """, (modifier,))
+        conn.commit()
+        return cur.rowcount
+
+
 def list_months() -> List[str]:
     # Returns months like ["2025-12", "2025-11"]
     with get_connection() as conn:
         rows = conn.execute("""
             SELECT DISTINCT substr(expense_date, 1, 7) AS month
             FROM expenses
+            UNION
+            SELECT month FROM archive_months
             ORDER BY month DESC;
         """).fetchall()
-    return [r["month"] for r in rows]
+    return [r[0] for r in rows]
 
 
-# ---------- Global Salary (stored as cents) ----------
+def category_usage_counts() -> List[Tuple[str, int]]:
+    # How often each category spelling is used by expenses and fixed expenses
+    # (archived years are left out, they are cold by definition)
+    with get_connection() as conn:
+        rows = conn.execute("""
+            SELECT category, SUM(n) FROM (
+                SELECT category, COUNT(*) AS n FROM expenses GROUP BY category
+                UNION ALL
+                SELECT category, COUNT(*) AS n FROM fixed_expenses GROUP BY category
+            )
+            GROUP BY category;
+        """).fetchall()
+    return [(category, int(n)) for category, n in rows]
 
-def set_global_salary_cents(salary_cents: int):
+
+# ---------- Archive partitions (closed years) ----------
+
+# SQLite allows 10 attached databases by default; keep headroom
+MAX_ATTACHED_PARTITIONS = 8
+
+# Bump when partition files need a schema upgrade (see _migrate_partitions);
+# 1 = expenses.currency
+PARTITION_SCHEMA_VERSION = 1
+
+
+def partition_path(year: int) -> Path:
+    return ARCHIVE_DIR / f"expenses_{year}.db"
+
+
+def _expense_columns(conn) -> List[str]:
+    return [r[1] for r in conn.execute("PRAGMA main.table_info(expenses);")]
+
+
+def _attach_partition(conn, year: int) -> str:
+    # ATTACHes the year's partition (once per connection) and returns its schema name
+    schema = f"archive_{year}"
+    attached = [r[1] for r in conn.execute("PRAGMA database_list;")]
+    if schema in attached:
+        return schema
+
+    if len([name for name in attached if name.startswith("archive_")]) >= MAX_ATTACHED_PARTITIONS:
+        _detach_partitions(conn)
+
+    ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+    conn.execute(f"ATTACH DATABASE ? AS {schema};", (str(partition_path(year)),))
+    return schema
+
+
+def _detach_partitions(conn):
+    # Only possible outside a write transaction (SQLite: "database is locked")
+    conn.execute("DROP VIEW IF EXISTS temp.all_expenses;")
+    for r in conn.execute("PRAGMA database_list;").fetchall():
+        if r[1].startswith("archive_"):
+            conn.execute(f"DETACH DATABASE {r[1]};")
+
+
+def _archived_years(conn, start_month: str, end_month: str) -> List[int]:
+    rows = conn.execute("""
+        SELECT DISTINCT CAST(substr(month, 1, 4) AS INTEGER) AS year
+        FROM archive_months
+        WHERE month BETWEEN ? AND ?
+        ORDER BY year ASC;
+    """, (start_month, end_month)).fetchall()
+    return [r[0] for r in rows]
+
+
+def _check_year_not_archived(conn, year: int):
+    if _archived_years(conn, f"{year:04d}-01", f"{year:04d}-12"):
+        raise ValueError(f"{year} is archived. Restore it before changing its expenses.")
+
+
+def expenses_table_for_month(conn, month_yyyy_mm: str) -> str:
+    # Name of the table holding the month's expenses on this connection
+    archived = conn.execute("""
+        SELECT 1 FROM archive_months WHERE month = ?;
+    """, (month_yyyy_mm,)).fetchone()
+    if not archived:
+        return "expenses"
+    return _attach_partition(conn, int(month_yyyy_mm[:4])) + ".expenses"
+
+
+def _attach_partitions(conn, years) -> List[str]:
+    # Attaches several partitions so they are all attached at the same time
+    attached = {r[1] for r in conn.execute("PRAGMA database_list;")}
+    wanted = {f"archive_{year}" for year in years}
+    if len({name for name in attached if name.startswith("archive_")} | wanted) > MAX_ATTACHED_PARTITIONS:
+        _detach_partitions(conn)
+    return [_attach_partition(conn, year) for year in years]
+
+
+def month_range_chunks(conn, start_month: str, end_month: str) -> List[Tuple[str, str]]:
+    # Splits a month range at year boundaries into consecutive chunks that
+    # each span at most MAX_ATTACHED_PARTITIONS archived years
+    years = _archived_years(conn, start_month, end_month)
+    chunks = []
+    first = start_month
+    for i in range(MAX_ATTACHED_PARTITIONS, len(years), MAX_ATTACHED_PARTITIONS):
+        boundary = years[i - 1]
+        chunks.append((first, f"{boundary:04d}-12"))
+        first = f"{boundary + 1:04d}-01"
+    chunks.append((first, end_month))
+    return chunks
+
+
+def expenses_source_for_range(conn, start_month: str, end_month: str) -> str:
+    # Table (or temp UNION ALL view) covering every expense in the month
+    # range; longer ranges go through month_range_chunks first
+    years = _archived_years(conn, start_month, end_month)
+    if not years:
+        return "expenses"
+    if len(years) > MAX_ATTACHED_PARTITIONS:
+        raise ValueError(
+            f"Range spans {len(years)} archived years; at most {MAX_ATTACHED_PARTITIONS} can be queried at once."
+        )
+
+    cols = ", ".join(_expense_columns(conn))
+    selects = [f"SELECT {cols} FROM main.expenses"]
+    for schema in _attach_partitions(conn, years):
+        selects.append(f"SELECT {cols} FROM {schema}.expenses")
+
+    conn.execute("DROP VIEW IF EXISTS temp.all_expenses;")
+    conn.execute(f"CREATE TEMP VIEW all_expenses AS {' UNION ALL '.join(selects)};")
+    return "all_expenses"
+
+
+def _migrate_partitions(conn):
+    # Partition files keep the expenses schema they were archived with;
+    # bring them up to date so UNION ALL views line up with main.expenses.
+    # Runs once per PARTITION_SCHEMA_VERSION (recorded in settings), so
+    # init_db doesn't attach every partition on each start; new partitions
+    # copy the current main.expenses schema.
+    row = conn.execute("SELECT value FROM settings WHERE key = 'partition_schema_version';").fetchone()
+    if row and int(row[0]) >= PARTITION_SCHEMA_VERSION:
+        return
+
+    years = [r[0] for r in conn.execute("""
+        SELECT DISTINCT CAST(substr(month, 1, 4) AS INTEGER) FROM archive_months ORDER BY 1;
+    """).fetchall()]
+    for i in range(0, len(years), MAX_ATTACHED_PARTITIONS):
+        batch = years[i:i + MAX_ATTACHED_PARTITIONS]
+        conn.commit()  # detaching the previous batch needs no open write transaction
+        for schema in _attach_partitions(conn, batch):
+            if conn.execute(f"""
+                SELECT 1 FROM {schema}.sqlite_master WHERE type = 'table' AND name = 'expenses';
+            """).fetchone():
+                _add_column_if_missing(conn, "expenses", "currency", "TEXT", schema)
+
+    conn.execute("""
+        INSERT INTO settings (key, value)
+        VALUES ('partition_schema_version', ?)
+        ON CONFLICT(key) DO UPDATE SET value=excluded.value;
+    """, (str(PARTITION_SCHEMA_VERSION),))
+
+
+def list_archived_years() -> List[Tuple[int, int]]:
+    # [(year, expense_count)]
+    with get_connection() as conn:
+        rows = conn.execute("""
+            SELECT CAST(substr(month, 1, 4) AS INTEGER) AS year, SUM(expense_count) AS total
+            FROM archive_months
+            GROUP BY year
+            ORDER BY year ASC;
+        """).fetchall()
+    return [(year, int(total)) for year, total in rows]
+
+
+def archive_year(year: int) -> int:
+    # Moves a closed year's expenses into its partition file. Returns rows moved.
+    if year >= date.today().year:
+        raise ValueError("Only past (closed) years can be archived.")
+
+    start, end = f"{year:04d}-01-01", f"{year + 1:04d}-01-01"
+    with get_connection() as conn:
+        schema = _attach_partition(conn, year)
+        cols = ", ".join(_expense_columns(conn))
+
+        table_sql = conn.execute("""
+            SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = 'expenses';
+        """).fetchone()[0]
+        conn.execute(table_sql.replace("CREATE TABLE expenses", f"CREATE TABLE IF NOT EXISTS {schema}.expenses", 1))
+        conn.execute(f"""
+            CREATE INDEX IF NOT EXISTS {schema}.idx_expenses_date ON expenses(expense_date);
+        """)
+
+        # Copy first and commit the partition on its own, so a crash before
+        # the delete below leaves the rows in expenses.db (re-running is safe).
+        conn.execute(f"""
+            INSERT OR REPLACE INTO {schema}.expenses ({cols})
+            SELECT {cols} FROM main.expenses
+            WHERE expense_date >= ? AND expense_date < ?;
+        """, (start, end))
+        conn.commit()
+
+        conn.execute("""
+            INSERT INTO archive_months (month, expense_count, archived_at)
+            SELECT substr(expense_date, 1, 7) AS month, COUNT(*), datetime('now')
+            FROM main.expenses
+            WHERE expense_date >= ? AND expense_date < ?
+            GROUP BY month
+            ON CONFLICT(month) DO UPDATE SET
+                expense_count = expense_count + excluded.expense_count,
+                archived_at = excluded.archived_at;
+        """, (start, end))
+        cur = conn.execute("""
+            DELETE FROM main.expenses
+            WHERE expense_date >= ? AND expense_date < ?;
+        """, (start, end))
+        _rebuild_daily_aggregates(conn, [year])  # the delete above dropped them
+        conn.commit()
+        return cur.rowcount
+
+
+def restore_year(year: int) -> int:
+    # Moves an archived year back into expenses.db and removes its partition file
+    path = partition_path(year)
+    with get_connection() as conn:
+        if not _archived_years(conn, f"{year:04d}-01", f"{year:04d}-12"):
+            return 0
+
+        schema = _attach_partition(conn, year)
+        cols = ", ".join(_expense_columns(conn))
+        cur = conn.execute(f"""
+            INSERT OR REPLACE INTO main.expenses ({cols})
+            SELECT {cols} FROM {schema}.expenses;
+        """)
+        conn.execute("""
+            DELETE FROM archive_months WHERE month BETWEEN ? AND ?;
+        """, (f"{year:04d}-01", f"{year:04d}-12"))
+        _rebuild_daily_aggregates(conn, [year])  # the inserts above counted them twice
+        conn.commit()
+        conn.execute("DROP VIEW IF EXISTS temp.all_expenses;")
+        conn.execute(f"DETACH DATABASE {schema};")
+        restored = cur.rowcount
+
+    path.unlink(missing_ok=True)
+    return restored
+
+
+# ---------- Currencies & exchange rates ----------
+
+DEFAULT_BASE_CURRENCY = "USD"
+
+_CURRENCY_CODE = re.compile(r"^[A-Z]{3}$")
+
+# currency -> (effective dates, rates) sorted by date, loaded on first use.
+# Rates are only ever added, so the cache is cleared whenever rates load.
+_rate_cache: Dict[str, Tuple[List[str], List[float]]] = {}
+
+
+def normalize_currency(code: str) -> str:
+    code = (code or "").strip().upper()
+    if not _CURRENCY_CODE.match(code):
+        raise ValueError(f"Invalid currency {code!r}. Use a 3-letter code like USD or EUR.")
+    return code
+
+
+def _base_currency(conn) -> str:
+    row = conn.execute("SELECT value FROM settings WHERE key = 'base_currency';").fetchone()
+    return row[0] if row else DEFAULT_BASE_CURRENCY
+
+
+def get_base_currency() -> str:
     with get_connection() as conn:
+        return _base_currency(conn)
+
+
+def set_base_currency(code: str):
+    # Rates are stored relative to the base, so it can only change before any are loaded
+    code = normalize_currency(code)
+    with get_connection() as conn:
+        if conn.execute("SELECT 1 FROM exchange_rates LIMIT 1;").fetchone():
+            raise ValueError("The base currency cannot change once exchange rates are loaded.")
         conn.execute("""
             INSERT INTO settings (key, value)
-            VALUES ('salary_cents', ?)
+            VALUES ('base_currency', ?)
             ON CONFLICT(key) DO UPDATE SET value=excluded.value;
-        """, (str(salary_cents),))
+        """, (code,))
+        conn.commit()
+
+
+def _check_currency(conn, currency: Optional[str]) -> Optional[str]:
+    # Value to store for an expense's currency: None for the base currency,
+    # otherwise a code that has at least one rate (so it always converts).
+    if currency is None:
+        return None
+    currency = normalize_currency(currency)
+    if currency == _base_currency(conn):
+        return None
+    if not conn.execute("""
+        SELECT 1 FROM exchange_rates WHERE currency = ? LIMIT 1;
+    """, (currency,)).fetchone():
+        raise ValueError(f"No exchange rate for {currency}. Load rates for it first.")
+    return currency
+
+
+def load_exchange_rates(path) -> int:
+    # CSV with a header: date,currency,rate where rate is the value of one
+    # unit of currency in the base currency. Returns rows loaded.
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        with get_connection() as conn:
+            base = _base_currency(conn)
+            rows = []
+            for line_no, r in enumerate(reader, start=2):
+                try:
+                    effective = date.fromisoformat(r["date"].strip()).isoformat()
+                    currency = normalize_currency(r["currency"])
+                    rate = float(r["rate"])
+                except (KeyError, AttributeError, ValueError) as e:
+                    raise ValueError(f"{path}, line {line_no}: {e}")
+                if currency == base or not rate > 0:
+                    raise ValueError(f"{path}, line {line_no}: rate must be positive and not for {base}")
+                rows.append((currency, effective, rate))
+
+            conn.executemany("""
+                INSERT INTO exchange_rates (currency, effective_date, rate_to_base)
+                VALUES (?, ?, ?)
+                ON CONFLICT(currency, effective_date) DO UPDATE SET rate_to_base=excluded.rate_to_base;
+            """, rows)
+            # foreign amounts in the aggregates were converted at the old rates
+            _rebuild_daily_aggregates(conn)
+            conn.commit()
+
+    _rate_cache.clear()
+    return len(rows)
+
+
+def list_currencies() -> List[str]:
+    # Base currency first, then every currency with rates
+    with get_connection() as conn:
+        rows = conn.execute("SELECT DISTINCT currency FROM exchange_rates ORDER BY currency;").fetchall()
+        return [_base_currency(conn)] + [r[0] for r in rows]
+
+
+def rate_to_base(currency: str, on_date: str) -> float:
+    # Rate in effect on on_date; before the first known rate, the earliest one
+    # (same rule as base_amount_sql). Cached, so per-expense calls stay cheap.
+    rates = _rate_cache.get(currency)
+    if rates is None:
+        with get_connection() as conn:
+            rows = conn.execute("""
+                SELECT effective_date, rate_to_base FROM exchange_rates
+                WHERE currency = ?
+                ORDER BY effective_date ASC;
+            """, (currency,)).fetchall()
+        if not rows:
+            raise ValueError(f"No exchange rate for {currency}.")
+        rates = _rate_cache[currency] = ([r[0] for r in rows], [r[1] for r in rows])
+
+    dates, values = rates
+    return values[max(bisect_right(dates, on_date) - 1, 0)]
+
+
+def convert_to_base(amount_cents: int, currency: Optional[str], on_date: str) -> int:
+    if currency is None:
+        return amount_cents
+    return int(round(amount_cents * rate_to_base(currency, on_date)))
+
+
+def base_amount_sql(alias: str) -> str:
+    # SQL expression for an expense row's amount in base-currency cents.
+    # Base rows (currency IS NULL) short-circuit; only foreign rows run the
+    # correlated lookups, each one seek on the exchange_rates primary key.
+    e = alias
+    return f"""CASE WHEN {e}.currency IS NULL THEN {e}.amount_cents
+        ELSE CAST(ROUND({e}.amount_cents * COALESCE(
+            (SELECT r.rate_to_base FROM main.exchange_rates AS r
+             WHERE r.currency = {e}.currency AND r.effective_date <= {e}.expense_date
+             ORDER BY r.effective_date DESC LIMIT 1),
+            (SELECT r.rate_to_base FROM main.exchange_rates AS r
+             WHERE r.currency = {e}.currency
+             ORDER BY r.effective_date ASC LIMIT 1)
+        )) AS INTEGER) END"""
+
+
+# ---------- Daily aggregates (per day and category) ----------
+
+# Kept in step with expenses by triggers, in base-currency cents, and
+# covering archived years too, so history queries never scan expenses.
+
+def _create_daily_aggregates(conn):
+    exists = conn.execute("""
+        SELECT 1 FROM main.sqlite_master WHERE type = 'table' AND name = 'daily_aggregates';
+    """).fetchone()
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS daily_aggregates (
+            day TEXT NOT NULL,        -- 'YYYY-MM-DD'
+            category TEXT NOT NULL,
+            expense_count INTEGER NOT NULL,
+            amount_cents INTEGER NOT NULL,
+            PRIMARY KEY (day, category)
+        ) WITHOUT ROWID;
+    """)
+
+    add = f"""
+        INSERT INTO daily_aggregates (day, category, expense_count, amount_cents)
+        VALUES (NEW.expense_date, NEW.category, 1, {base_amount_sql("NEW")})
+        ON CONFLICT(day, category) DO UPDATE SET
+            expense_count = expense_count + 1,
+            amount_cents = amount_cents + excluded.amount_cents;
+    """
+    remove = f"""
+        UPDATE daily_aggregates SET
+            expense_count = expense_count - 1,
+            amount_cents = amount_cents - {base_amount_sql("OLD")}
+        WHERE day = OLD.expense_date AND category = OLD.category;
+        DELETE FROM daily_aggregates
+        WHERE day = OLD.expense_date AND category = OLD.category AND expense_count <= 0;
+    """
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS expenses_aggregate_insert AFTER INSERT ON expenses BEGIN {add} END;")
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS expenses_aggregate_delete AFTER DELETE ON expenses BEGIN {remove} END;")
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS expenses_aggregate_update
+        AFTER UPDATE OF amount_cents, category, expense_date, currency ON expenses
+        BEGIN {remove} {add} END;
+    """)
+
+    # also finishes a full rebuild that was interrupted (see below)
+    stale = conn.execute("SELECT 1 FROM settings WHERE key = 'daily_aggregates_stale';").fetchone()
+    if not exists or stale:
+        _rebuild_daily_aggregates(conn)
+
+
+def _rebuild_daily_aggregates(conn, years=None):
+    # Recomputes the aggregates of the given years from main.expenses or
+    # the year's (already attached) partition.
+    #
+    # years=None rebuilds everything. There can be more archived years than
+    # partitions attached at once, and detaching is impossible inside a
+    # write transaction, so this commits between batches of partitions; a
+    # settings flag makes init_db redo the rebuild if it is interrupted.
+    if years is not None:
+        for year in years:
+            _rebuild_daily_aggregates_year(conn, year)
+        return
+
+    conn.execute("""
+        INSERT INTO settings (key, value) VALUES ('daily_aggregates_stale', '1')
+        ON CONFLICT(key) DO NOTHING;
+    """)
+    conn.execute("DELETE FROM daily_aggregates;")
+    for (year,) in conn.execute("""
+        SELECT DISTINCT CAST(substr(expense_date, 1, 4) AS INTEGER) FROM main.expenses;
+    """).fetchall():
+        _rebuild_daily_aggregates_year(conn, year)
+
+    archived = [r[0] for r in conn.execute("""
+        SELECT DISTINCT CAST(substr(month, 1, 4) AS INTEGER) FROM archive_months ORDER BY 1;
+    """).fetchall()]
+    for i in range(0, len(archived), MAX_ATTACHED_PARTITIONS):
+        batch = archived[i:i + MAX_ATTACHED_PARTITIONS]
         conn.commit()
+        _attach_partitions(conn, batch)
+        for year in batch:
+            _rebuild_daily_aggregates_year(conn, year)
+
+    conn.execute("DELETE FROM settings WHERE key = 'daily_aggregates_stale';")
+
+
+def _rebuild_daily_aggregates_year(conn, year: int):
+    # Partitions of archived years must already be attached, or attachable
+    # without detaching others, when called inside a write transaction
+    start, end = f"{year:04d}-01-01", f"{year + 1:04d}-01-01"
+    if _archived_years(conn, f"{year:04d}-01", f"{year:04d}-12"):
+        table = _attach_partition(conn, year) + ".expenses"
+    else:
+        table = "main.expenses"
+    conn.execute("""
+        DELETE FROM daily_aggregates WHERE day >= ? AND day < ?;
+    """, (start, end))
+    conn.execute(f"""
+        INSERT INTO daily_aggregates (day, category, expense_count, amount_cents)
+        SELECT expense_date, category, COUNT(*), SUM({base_amount_sql("e")})
+        FROM {table} AS e
+        WHERE expense_date >= ? AND expense_date < ?
+        GROUP BY expense_date, category;
+    """, (start, end))
+
+
+# ---------- Global Salary (stored as cents) ----------
+
+# Kept for older callers: the settings value is only read once, to seed the
+# income history (_migrate_global_salary), so both go through the history's
+# DEFAULT_INCOME_SOURCE for the current month instead.
+
+def set_global_salary_cents(salary_cents: int):
+    set_income(DEFAULT_INCOME_SOURCE, date.today().isoformat()[:7], salary_cents)
 
 
 def get_global_salary_cents() -> int:
+    sources = dict(income_sources_for_month(date.today().isoformat()[:7]))
+    return sources.get(DEFAULT_INCOME_SOURCE, 0)
+
+
+# ---------- Income History (stored as cents) ----------
+
+# Effective month used for amounts that apply to all of history
+# (e.g. the old global salary when it is migrated).
+INCOME_EPOCH_MONTH = "0000-01"
+DEFAULT_INCOME_SOURCE = "Salary"
+
+
+def _migrate_global_salary(conn):
+    # Seed the history from the legacy global salary exactly once
+    has_history = conn.execute("SELECT 1 FROM income_history LIMIT 1;").fetchone()
+    if has_history:
+        return
+
+    row = conn.execute("""
+        SELECT value FROM settings WHERE key = 'salary_cents';
+    """).fetchone()
+    if row and int(row[0]) > 0:
+        _set_income(conn, DEFAULT_INCOME_SOURCE, INCOME_EPOCH_MONTH, int(row[0]))
+
+
+def _set_income(conn, source: str, effective_month: str, amount_cents: int):
+    conn.execute("""
+        INSERT INTO income_sources (name) VALUES (?)
+        ON CONFLICT(name) DO NOTHING;
+    """, (source,))
+    conn.execute("""
+        INSERT INTO income_history (source_id, effective_month, amount_cents)
+        VALUES ((SELECT id FROM income_sources WHERE name = ?), ?, ?)
+        ON CONFLICT(source_id, effective_month) DO UPDATE SET amount_cents=excluded.amount_cents;
+    """, (source, effective_month, amount_cents))
+
+
+def set_income(source: str, effective_month: str, amount_cents: int):
+    # Amount applies from effective_month onwards; 0 stops the source
     with get_connection() as conn:
-        row = conn.execute("""
-            SELECT value FROM settings WHERE key = 'salary_cents';
-        """).fetchone()
-    return int(row["value"]) if row else 0
+        _set_income(conn, source, effective_month, amount_cents)
+        conn.commit()
+
 
-def add_fixed_expense(name: str, amount_cents: int, category: str, start_month: str, end_month: str | None):
+def delete_income(source: str, effective_month: str) -> bool:
     with get_connection() as conn:
-        conn.execute("""
-            INSERT INTO fixed_expenses (name, amount_cents, category, start_month, end_month, active)
-            VALUES (?, ?, ?, ?, ?, 1);
-        """, (name, amount_cents, category, start_month, end_month))
+        cur = conn.execute("""
+            DELETE FROM income_history
+            WHERE source_id = (SELECT id FROM income_sources WHERE name = ?)
+              AND effective_month = ?;
+        """, (source, effective_month))
         conn.commit()
+        return cur.rowcount > 0
 
 
-def list_fixed_expenses():
+def list_income_history() -> List[IncomeEntry]:
     with get_connection() as conn:
         rows = conn.execute("""
-            SELECT id, name, amount_cents, category, start_month, end_month, active
-            FROM fixed_expenses
-            ORDER BY active DESC, name ASC;
+            SELECT s.name AS source, h.effective_month, h.amount_cents
+            FROM income_history h
+            JOIN income_sources s ON s.id = h.source_id
+            ORDER BY s.name ASC, h.effective_month DESC;
+        """).fetchall()
+    return list(map(make_income_entry, rows))
+
+
+def income_sources_for_month(month_yyyy_mm: str):
+    # Amount in effect for every source: one primary-key seek per source
+    with get_connection() as conn:
+        rows = conn.execute("""
+            SELECT s.name AS source,
+                   (SELECT h.amount_cents
+                    FROM income_history h
+                    WHERE h.source_id = s.id AND h.effective_month <= ?
+                    ORDER BY h.effective_month DESC
+                    LIMIT 1) AS amount_cents
+            FROM income_sources s
+            ORDER BY s.name ASC;
+        """, (month_yyyy_mm,)).fetchall()
+    return [(source, int(cents)) for source, cents in rows if cents]
+
+
+def income_for_month_range(start_month: str, end_month: str) -> List[Tuple[str, int]]:
+    # Resolves total income for every month in [start_month, end_month] in
+    # one query; each (month, source) pair is a single primary-key seek.
+    with get_connection() as conn:
+        rows = conn.execute("""
+            WITH RECURSIVE months(month) AS (
+                SELECT ?
+                UNION ALL
+                SELECT substr(date(month || '-01', '+1 month'), 1, 7)
+                FROM months
+                WHERE month < ?
+            )
+            SELECT m.month,
+                   COALESCE(SUM((SELECT h.amount_cents
+                                 FROM income_history h
+                                 WHERE h.source_id = s.id AND h.effective_month <= m.month
+                                 ORDER BY h.effective_month DESC
+                                 LIMIT 1)), 0) AS total_cents
+            FROM months m
+            LEFT JOIN income_sources s
+            GROUP BY m.month
+            ORDER BY m.month ASC;
+        """, (start_month, end_month)).fetchall()
+    return [(month, int(total)) for month, total in rows]
+
+
+def income_for_month(month_yyyy_mm: str) -> int:
+    return income_for_month_range(month_yyyy_mm, month_yyyy_mm)[0][1]
+
+# ---------- Fixed Expenses (recurring) ----------
+
+# Recurrence = every <interval_count> <interval_unit>, anchored on the first
+# day of start_month. Presets map the GUI choices onto that pair.
+INTERVAL_UNITS = ("day", "week", "month", "year")
+RECURRENCE_PRESETS = {
+    "weekly": ("week", 1),
+    "monthly": ("month", 1),
+    "quarterly": ("month", 3),
+    "annual": ("year", 1),
+}
+
+# Open-ended fixed expenses are expanded this many months past today; months
+# further out are computed on the fly and never written to fixed_schedule
+SCHEDULE_HORIZON_MONTHS = 24
+# Lower bound when expanding a whole schedule (each fixed expense starts at
+# its own start_month anyway), and the horizon of a schedule never written
+SCHEDULE_EPOCH_MONTH = "0000-01"
+
+
+def _month_index(month_yyyy_mm: str) -> int:
+    return int(month_yyyy_mm[:4]) * 12 + int(month_yyyy_mm[5:7]) - 1
+
+
+def _month_from_index(index: int) -> str:
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def add_months(month_yyyy_mm: str, months: int) -> str:
+    return _month_from_index(_month_index(month_yyyy_mm) + months)
+
+
+def expand_occurrences(start_month: str, interval_unit: str, interval_count: int,
+                       from_month: str, to_month: str) -> Dict[str, int]:
+    # Number of occurrences per month in [from_month, to_month]
+    if interval_unit not in INTERVAL_UNITS:
+        raise ValueError(f"Unknown interval unit: {interval_unit}")
+    if interval_count < 1:
+        raise ValueError("Interval must be >= 1")
+
+    from_month = max(from_month, start_month)
+    if from_month > to_month:
+        return {}
+
+    counts: Dict[str, int] = {}
+
+    if interval_unit in ("month", "year"):
+        step = interval_count * (12 if interval_unit == "year" else 1)
+        start_i = _month_index(start_month)
+        first = _month_index(from_month)
+        # first occurrence on or after from_month
+        first += (start_i - first) % step
+        for i in range(first, _month_index(to_month) + 1, step):
+            counts[_month_from_index(i)] = 1
+        return counts
+
+    step = timedelta(days=interval_count * (7 if interval_unit == "week" else 1))
+    start = date.fromisoformat(start_month + "-01")
+    lower = date.fromisoformat(from_month + "-01")
+    # skip straight to the first occurrence on or after from_month
+    skipped = -(-(lower - start).days // step.days)
+    day = start + step * skipped
+    while True:
+        month = day.isoformat()[:7]
+        if month > to_month:
+            break
+        counts[month] = counts.get(month, 0) + 1
+        if day > date.max - step:
+            break  # last representable occurrence (year 9999)
+        day += step
+    return counts
+
+
+def _schedule_horizon(conn) -> Optional[str]:
+    row = conn.execute("""
+        SELECT value FROM settings WHERE key = 'fixed_schedule_horizon';
+    """).fetchone()
+    return row[0] if row else None
+
+
+def _set_schedule_horizon(conn, month_yyyy_mm: str):
+    conn.execute("""
+        INSERT INTO settings (key, value)
+        VALUES ('fixed_schedule_horizon', ?)
+        ON CONFLICT(key) DO UPDATE SET value=excluded.value;
+    """, (month_yyyy_mm,))
+
+
+def _default_horizon() -> str:
+    return add_months(date.today().isoformat()[:7], SCHEDULE_HORIZON_MONTHS)
+
+
+def _occurrence_rows(rows, from_month: str, to_month: str) -> Iterator[Tuple[str, int, str, int, int]]:
+    # (month, fixed_id, category, occurrences, amount_cents) for the given
+    # fixed_expenses rows within the window
+    for r in map(make_fixed_expense, rows):
+        last = min(to_month, r.end_month) if r.end_month else to_month
+        counts = expand_occurrences(r.start_month, r.interval_unit, r.interval_count, from_month, last)
+        for month, n in counts.items():
+            yield month, r.id, r.category, n, n * r.amount_cents
+
+
+def _schedule_fixed(conn, rows, from_month: str, to_month: str):
+    # Writes schedule rows for the given fixed_expenses rows within the window
+    conn.executemany("""
+        INSERT OR REPLACE INTO fixed_schedule (month, fixed_id, category, occurrences, amount_cents)
+        VALUES (?, ?, ?, ?, ?);
+    """, _occurrence_rows(rows, from_month, to_month))
+
+
+def _unscheduled_occurrences(conn, from_month: str, to_month: str) -> List[Tuple[str, int, str, int, int]]:
+    # Occurrences past the materialized horizon, computed without writing
+    horizon = _schedule_horizon(conn) or SCHEDULE_EPOCH_MONTH
+    from_month = max(from_month, add_months(horizon, 1))
+    if from_month > to_month:
+        return []
+    rows = conn.execute(f"""
+        SELECT {FIXED_EXPENSE_COLUMNS} FROM fixed_expenses
+        WHERE active = 1 AND start_month <= ? AND (end_month IS NULL OR end_month >= ?);
+    """, (to_month, from_month)).fetchall()
+    return list(_occurrence_rows(rows, from_month, to_month))
+
+
+def _reschedule_fixed(conn, fixed_id: Optional[int] = None):
+    # Regenerates the schedule of one fixed expense (or all of them)
+    # from its start month up to the current horizon.
+    horizon = _schedule_horizon(conn) or _default_horizon()
+
+    if fixed_id is None:
+        conn.execute("DELETE FROM fixed_schedule;")
+        rows = conn.execute(f"""
+            SELECT {FIXED_EXPENSE_COLUMNS} FROM fixed_expenses WHERE active = 1;
         """).fetchall()
-    return rows
+    else:
+        conn.execute("DELETE FROM fixed_schedule WHERE fixed_id = ?;", (fixed_id,))
+        rows = conn.execute(f"""
+            SELECT {FIXED_EXPENSE_COLUMNS} FROM fixed_expenses WHERE id = ? AND active = 1;
+        """, (fixed_id,)).fetchall()
+
+    _schedule_fixed(conn, rows, SCHEDULE_EPOCH_MONTH, horizon)
+    _set_schedule_horizon(conn, horizon)
+
+
+def _ensure_schedule_horizon(conn, through_month: str) -> bool:
+    # Extends open-ended schedules so they cover through_month, but never
+    # past today + SCHEDULE_HORIZON_MONTHS. Returns True if anything was written.
+    through_month = min(through_month, _default_horizon())
+    horizon = _schedule_horizon(conn)
+    if horizon is None:
+        _reschedule_fixed(conn)
+        horizon = _schedule_horizon(conn)
+    if through_month <= horizon:
+        return False
+
+    new_horizon = _default_horizon()
+    rows = conn.execute(f"""
+        SELECT {FIXED_EXPENSE_COLUMNS} FROM fixed_expenses
+        WHERE active = 1 AND (end_month IS NULL OR end_month > ?);
+    """, (horizon,)).fetchall()
+    _schedule_fixed(conn, rows, add_months(horizon, 1), new_horizon)
+    _set_schedule_horizon(conn, new_horizon)
+    return True
+
+
+def add_fixed_expense(name: str, amount_cents: int, category: str, start_month: str, end_month: str | None,
+                      interval_unit: str = "month", interval_count: int = 1) -> int:
+    # validates the recurrence before anything is written
+    expand_occurrences(start_month, interval_unit, interval_count, start_month, start_month)
+
+    with get_connection() as conn:
+        cur = conn.execute("""
+            INSERT INTO fixed_expenses
+                (name, amount_cents, category, start_month, end_month, active, interval_unit, interval_count)
+            VALUES (?, ?, ?, ?, ?, 1, ?, ?);
+        """, (name, amount_cents, category, start_month, end_month, interval_unit, interval_count))
+        _reschedule_fixed(conn, cur.lastrowid)
+        conn.commit()
+        return cur.lastrowid
+
+
+def iter_fixed_expenses() -> Iterator[FixedExpense]:
+    return _iter_records(get_connection(), make_fixed_expense, f"""
+        SELECT {FIXED_EXPENSE_COLUMNS}
+        FROM fixed_expenses
+        ORDER BY active DESC, name ASC;
+    """)
+
+
+def list_fixed_expenses() -> List[FixedExpense]:
+    return list(iter_fixed_expenses())
 
 
 def delete_fixed_expense(fixed_id: int) -> bool:
     with get_connection() as conn:
         cur = conn.execute("DELETE FROM fixed_expenses WHERE id = ?;", (fixed_id,))
+        conn.execute("DELETE FROM fixed_schedule WHERE fixed_id = ?;", (fixed_id,))
         conn.commit()
         return cur.rowcount > 0
 
 
+def _reschedule_selected_fixed(conn):
+    # _reschedule_fixed for every id in temp.selected_ids at once
+    horizon = _schedule_horizon(conn) or _default_horizon()
+    conn.execute("DELETE FROM fixed_schedule WHERE fixed_id IN (SELECT id FROM temp.selected_ids);")
+    rows = conn.execute(f"""
+        SELECT {FIXED_EXPENSE_COLUMNS} FROM fixed_expenses
+        WHERE id IN (SELECT id FROM temp.selected_ids) AND active = 1;
+    """).fetchall()
+    _schedule_fixed(conn, rows, SCHEDULE_EPOCH_MONTH, horizon)
+    _set_schedule_horizon(conn, horizon)
+
+
+def delete_fixed_expenses(ids) -> int:
+    with get_connection() as conn:
+        _select_ids(conn, ids)
+        cur = conn.execute("DELETE FROM fixed_expenses WHERE id IN (SELECT id FROM temp.selected_ids);")
+        conn.execute("DELETE FROM fixed_schedule WHERE fixed_id IN (SELECT id FROM temp.selected_ids);")
+        conn.commit()
+        return cur.rowcount
+
+
+def recategorize_fixed_expenses(ids, category: str) -> int:
+    category = category.strip()
+    if not category:
+        raise ValueError("Category cannot be empty.")
+    with get_connection() as conn:
+        _select_ids(conn, ids)
+        cur = conn.execute("""
+            UPDATE fixed_expenses SET category = ?
+            WHERE id IN (SELECT id FROM temp.selected_ids);
+        """, (category,))
+        # occurrences don't move, so the schedule only needs the new name
+        conn.execute("""
+            UPDATE fixed_schedule SET category = ?
+            WHERE fixed_id IN (SELECT id FROM temp.selected_ids);
+        """, (category,))
+        conn.commit()
+        return cur.rowcount
+
+
+def shift_fixed_months(ids, months: int) -> int:
+    # Moves start (and end) months of fixed expenses by a number of months
+    modifier = f"{int(months):+d} months"
+    with get_connection() as conn:
+        _select_ids(conn, ids)
+        cur = conn.execute("""
+            UPDATE fixed_expenses
+            SET start_month = substr(date(start_month || '-01', ?), 1, 7),
+                end_month = substr(date(end_month || '-01', ?), 1, 7)
+            WHERE id IN (SELECT id FROM temp.selected_ids);
+        """, (modifier, modifier))
+        _reschedule_selected_fixed(conn)
+        conn.commit()
+        return cur.rowcount
+
+
 def set_fixed_active(fixed_id: int, is_active: bool):
     with get_connection() as conn:
         conn.execute("""
@@ -141,17 +1229,54 @@ def set_fixed_active(fixed_id: int, is_active: bool):
             SET active = ?
             WHERE id = ?;
         """, (1 if is_active else 0, fixed_id))
+        _reschedule_fixed(conn, fixed_id)
         conn.commit()
 
 
+# Readers never extend the schedule (init_db does), so report queries work
+# on read-only connections and never write: months past the stored horizon
+# come from _unscheduled_occurrences.
+
 def fixed_total_for_month(month_yyyy_mm: str) -> int:
-    # Applies fixed expenses that are active and within the date range
+    # Precomputed schedule: one index range over the month's rows
     with get_connection() as conn:
         row = conn.execute("""
             SELECT COALESCE(SUM(amount_cents), 0) AS total
-            FROM fixed_expenses
-            WHERE active = 1
-              AND start_month <= ?
-              AND (end_month IS NULL OR end_month >= ?);
-        """, (month_yyyy_mm, month_yyyy_mm)).fetchone()
-    return int(row["total"])
+            FROM fixed_schedule
+            WHERE month = ?;
+        """, (month_yyyy_mm,)).fetchone()
+        extra = _unscheduled_occurrences(conn, month_yyyy_mm, month_yyyy_mm)
+    return int(row[0]) + sum(r[4] for r in extra)
+
+
+def fixed_totals_for_month_range(start_month: str, end_month: str) -> Dict[str, int]:
+    with get_connection() as conn:
+        rows = conn.execute("""
+            SELECT month, SUM(amount_cents) AS total_cents
+            FROM fixed_schedule
+            WHERE month BETWEEN ? AND ?
+            GROUP BY month;
+        """, (start_month, end_month)).fetchall()
+        extra = _unscheduled_occurrences(conn, start_month, end_month)
+
+    totals = {month: int(total) for month, total in rows}
+    for month, _, _, _, cents in extra:
+        totals[month] = totals.get(month, 0) + cents
+    return totals
+
+
+def fixed_category_totals_for_month(month_yyyy_mm: str) -> List[Tuple[str, int]]:
+    # [(category, cents)] of the month's fixed expenses, largest first
+    with get_connection() as conn:
+        rows = conn.execute("""
+            SELECT category, SUM(amount_cents) AS total_cents
+            FROM fixed_schedule
+            WHERE month = ?
+            GROUP BY category;
+        """, (month_yyyy_mm,)).fetchall()
+        extra = _unscheduled_occurrences(conn, month_yyyy_mm, month_yyyy_mm)
+
+    totals = {category: int(total) for category, total in rows}
+    for _, _, category, _, cents in extra:
+        totals[category] = totals.get(category, 0) + cents
+    return sorted(totals.items(), key=lambda x: x[1], reverse=True)
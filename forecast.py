@@ -0,0 +1,137 @@
+import calendar
+from datetime import date, timedelta
+from typing import List, Optional
+
+import numpy as np
+
+from db import get_connection, add_months, fixed_total_for_month
+from models import Anomaly, MonthForecast
+
+# Trailing days each day is compared with (also the pace used for projections)
+BASELINE_DAYS = 56
+# Previous months each category is compared with
+BASELINE_MONTHS = 6
+# How many days the historical pace counts for against this month's own pace;
+# early in a month the projection leans on history, later on actual spending.
+BASELINE_WEIGHT_DAYS = 10
+
+# Flag spending this many standard deviations above its baseline...
+ANOMALY_SCORE = 3.0
+# ...and at least this far above it, so tiny amounts never show up
+MIN_ANOMALY_CENTS = 2000
+MAX_ANOMALIES = 3
+
+# Nothing is flagged until the baseline has real history: a day needs a
+# trailing window that starts after the first recorded expense and has
+# spending on at least MIN_HISTORY_DAYS of its days, a category needs
+# spending in MIN_HISTORY_MONTHS of its baseline months
+MIN_HISTORY_DAYS = 14
+MIN_HISTORY_MONTHS = 3
+
+
+def _daily_series(conn, start: date, end: date) -> np.ndarray:
+    # Spending per day from start to end inclusive (0 on days without expenses)
+    series = np.zeros((end - start).days + 1)
+    rows = conn.execute("""
+        SELECT CAST(julianday(day) - julianday(?) AS INTEGER) AS offset, SUM(amount_cents)
+        FROM daily_aggregates
+        WHERE day >= ? AND day <= ?
+        GROUP BY day;
+    """, (start.isoformat(), start.isoformat(), end.isoformat())).fetchall()
+    if rows:
+        offsets, totals = np.array(rows, dtype=np.int64).T
+        series[offsets] = totals
+    return series
+
+
+def _rolling_baseline(series: np.ndarray, window: int):
+    # Mean, standard deviation and number of non-zero days of the `window`
+    # values before each position from `window` on, via prefix sums (no
+    # Python loop).
+    sums = np.concatenate(([0.0], np.cumsum(series)))
+    squares = np.concatenate(([0.0], np.cumsum(series * series)))
+    active = np.concatenate(([0], np.cumsum(series > 0)))
+    end = np.arange(window, len(series))
+    mean = (sums[end] - sums[end - window]) / window
+    var = (squares[end] - squares[end - window]) / window - mean * mean
+    return mean, np.sqrt(np.maximum(var, 0.0)), active[end] - active[end - window]
+
+
+def _anomalies(keys, actual, mean, std, has_history) -> List[Anomaly]:
+    # Entries well above a baseline with enough history, highest score first
+    excess = actual - mean
+    score = excess / np.maximum(std, 1.0)
+    flagged = np.flatnonzero(has_history & (excess >= MIN_ANOMALY_CENTS) & (score >= ANOMALY_SCORE))
+    flagged = flagged[np.argsort(-score[flagged])][:MAX_ANOMALIES]
+    return [Anomaly(keys[i], int(actual[i]), int(round(mean[i])), round(float(score[i]), 1)) for i in flagged]
+
+
+def forecast_month(month_yyyy_mm: str, today: Optional[date] = None) -> MonthForecast:
+    today = today or date.today()
+    first = date.fromisoformat(month_yyyy_mm + "-01")
+    days_in_month = calendar.monthrange(first.year, first.month)[1]
+    last = first + timedelta(days=days_in_month - 1)
+
+    # Days of the month that count as actual spending so far
+    as_of = min(max(today, first - timedelta(days=1)), last)
+    elapsed = (as_of - first).days + 1
+
+    history_start = first - timedelta(days=BASELINE_DAYS)
+    category_start = date.fromisoformat(add_months(month_yyyy_mm, -BASELINE_MONTHS) + "-01")
+    with get_connection() as conn:
+        series = _daily_series(conn, history_start, last)
+        category_rows = conn.execute("""
+            SELECT category, substr(day, 1, 7) AS month, SUM(amount_cents)
+            FROM daily_aggregates
+            WHERE day >= ? AND day <= ?
+            GROUP BY category, month;
+        """, (category_start.isoformat(), as_of.isoformat())).fetchall()
+        ledger_start = conn.execute("SELECT MIN(day) FROM daily_aggregates;").fetchone()[0]
+
+    month_series = series[BASELINE_DAYS:]
+    to_date = month_series[:elapsed].sum()
+
+    # Projection: spending so far plus the remaining days at a pace that
+    # blends the historical daily average with this month's own pace
+    history_pace = series[:BASELINE_DAYS].mean()
+    pace = (to_date + BASELINE_WEIGHT_DAYS * history_pace) / (elapsed + BASELINE_WEIGHT_DAYS)
+    projected = to_date + (days_in_month - elapsed) * pace
+    projected = max(projected, month_series.sum())  # never below what is already entered
+    fixed = fixed_total_for_month(month_yyyy_mm)
+
+    # Unusual days: each elapsed day against the BASELINE_DAYS before it
+    mean, std, active_days = _rolling_baseline(series[:BASELINE_DAYS + elapsed], BASELINE_DAYS)
+    days = [(first + timedelta(days=i)).isoformat() for i in range(elapsed)]
+    # day i's window starts at history_start + i
+    window_in_ledger = np.arange(elapsed) >= ((date.fromisoformat(ledger_start) - history_start).days
+                                              if ledger_start else 0)
+    unusual_days = _anomalies(days, month_series[:elapsed], mean, std,
+                              window_in_ledger & (active_days >= MIN_HISTORY_DAYS))
+
+    # Unusual categories: month to date against the same share of previous months
+    unusual_categories = []
+    if category_rows and elapsed > 0:
+        categories = sorted({r[0] for r in category_rows})
+        months = [add_months(month_yyyy_mm, -n) for n in range(BASELINE_MONTHS, -1, -1)]
+        row_of = {c: i for i, c in enumerate(categories)}
+        col_of = {m: i for i, m in enumerate(months)}
+        totals = np.zeros((len(categories), len(months)))
+        for category, month, cents in category_rows:
+            totals[row_of[category], col_of[month]] = cents
+
+        share = elapsed / days_in_month
+        history = totals[:, :-1] * share
+        active_months = np.count_nonzero(history, axis=1)
+        unusual_categories = _anomalies(categories, totals[:, -1], history.mean(axis=1), history.std(axis=1),
+                                        active_months >= MIN_HISTORY_MONTHS)
+
+    return MonthForecast(
+        month_yyyy_mm,
+        as_of.isoformat(),
+        int(to_date),
+        int(round(projected)),
+        fixed,
+        int(round(projected)) + fixed,
+        unusual_days,
+        unusual_categories,
+    )
@@ -1,7 +1,9 @@
 # gui_app.py
 from datetime import datetime
+import threading
+import time
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog, simpledialog
 
 import matplotlib
 matplotlib.use("TkAgg")
@@ -11,21 +13,39 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from db import (
     init_db,
     add_expense,
-    delete_expense,
-    list_expenses_for_month,
+    delete_expenses,
+    recategorize_expenses,
+    shift_expense_dates,
+    iter_expenses_for_month,
     list_months,
-    set_global_salary_cents,
-    get_global_salary_cents,
+    set_income,
+    income_sources_for_month,
+    DEFAULT_INCOME_SOURCE,
     add_fixed_expense,
-    list_fixed_expenses,
-    delete_fixed_expense,
+    iter_fixed_expenses,
+    delete_fixed_expenses,
+    recategorize_fixed_expenses,
+    shift_fixed_months,
     set_fixed_active,
+    archive_year,
+    restore_year,
+    category_usage_counts,
+    load_exchange_rates,
+    list_currencies,
+    list_archived_years,
+    RECURRENCE_PRESETS,
+    INTERVAL_UNITS,
 )
 
+from category_index import CategoryIndex
+from forecast import forecast_month
+from maintenance import iter_maintenance, maintenance_due, summarize_steps
+from backup import BACKUPS_DIR, create_snapshot, restore_snapshot, run_scheduled_snapshot
+
 from reports import (
     combined_category_breakdown,
     daily_totals,
-    income_vs_spend,  # returns: salary, variable, fixed, total_spend, net
+    income_vs_spend,  # returns MonthSnapshot: month, salary, variable, fixed, total_spend, net
 )
 
 
@@ -69,8 +89,78 @@ def month_from_date(date_str: str) -> str:
     return date_str[:7]
 
 
+def describe_recurrence(interval_unit: str, interval_count: int) -> str:
+    for preset, pair in RECURRENCE_PRESETS.items():
+        if pair == (interval_unit, interval_count):
+            return preset.capitalize()
+    return f"Every {interval_count} {interval_unit}s"
+
+
+def describe_forecast(forecast) -> str:
+    detail = f"variable ${forecast.projected_variable_cents/100:.2f}"
+    if forecast.as_of.startswith(forecast.month):  # nothing elapsed yet for future months
+        detail += f", ${forecast.variable_to_date_cents/100:.2f} so far as of {forecast.as_of}"
+    lines = [f"Projected month-end spend: ${forecast.projected_total_cents/100:.2f} ({detail})"]
+    unusual = [
+        f"{a.key} ${a.amount_cents/100:.2f} (usually ${a.baseline_cents/100:.2f})"
+        for a in forecast.unusual_days + forecast.unusual_categories
+    ]
+    if unusual:
+        lines.append("Unusual: " + ";  ".join(unusual))
+    return "\n".join(lines)
+
+
+# ---------------- Widgets ----------------
+
+class CategoryCombobox(ttk.Combobox):
+    # Free-text category entry that completes from a shared CategoryIndex:
+    # the dropdown (Down arrow) lists the best matches and the top match is
+    # filled in inline, selected, so typing simply continues over it.
+
+    NAVIGATION_KEYS = {"Up", "Down", "Left", "Right", "Return", "Escape", "Tab", "Home", "End",
+                       "Shift_L", "Shift_R", "Control_L", "Control_R", "Alt_L", "Alt_R"}
+    EDIT_KEYS = {"BackSpace", "Delete"}
+
+    def __init__(self, master, index: CategoryIndex, **kwargs):
+        super().__init__(master, **kwargs)
+        self.category_index = index
+        self.bind("<KeyRelease>", self._on_key_release)
+
+    def _on_key_release(self, event):
+        if event.keysym in self.NAVIGATION_KEYS:
+            return
+
+        # only what the user typed, not an inline completion still selected
+        typed = self.get()
+        if self.selection_present():
+            typed = typed[:self.index("sel.first")]
+
+        suggestions = self.category_index.suggest(typed)
+        self["values"] = suggestions
+
+        if event.keysym in self.EDIT_KEYS or not typed or not suggestions:
+            return
+        best = suggestions[0]
+        if best.casefold().startswith(typed.casefold()) and len(best) > len(typed):
+            self.delete(0, tk.END)
+            self.insert(0, typed + best[len(typed):])
+            self.select_range(len(typed), tk.END)
+            self.icursor(len(typed))
+
+
 # ---------------- GUI App ----------------
 
+BACKUP_FIRST_CHECK_MS = 5_000
+BACKUP_CHECK_INTERVAL_MS = 60 * 60 * 1000
+BACKUP_POLL_MS = 200
+
+# Maintenance only starts after this long without keyboard/mouse input and
+# runs one short slice per callback, yielding to the event loop in between.
+MAINTENANCE_CHECK_INTERVAL_MS = 5 * 60 * 1000
+MAINTENANCE_IDLE_SECONDS = 120
+MAINTENANCE_SLICE_GAP_MS = 50
+
+
 class ExpenseTrackerGUI(tk.Tk):
     def __init__(self):
         super().__init__()
@@ -79,12 +169,48 @@ class ExpenseTrackerGUI(tk.Tk):
 
         init_db()
 
+        self.category_index = CategoryIndex(category_usage_counts())
+
         self.selected_month = tk.StringVar()
+        self.income_source_var = tk.StringVar(value=DEFAULT_INCOME_SOURCE)
         self.salary_var = tk.StringVar()
 
+        self._backup_thread = None
+        self._backup_result = None
+        self._last_activity = time.monotonic()
+        self._maintenance = None
+        self._maintenance_steps = []
+
+        self._build_menu()
         self._build_ui()
         self._load_initial_state()
 
+        self.after(BACKUP_FIRST_CHECK_MS, self._scheduled_backup)
+
+        for event in ("<Key>", "<Button>", "<MouseWheel>"):
+            self.bind_all(event, self._note_activity, add="+")
+        self.after(MAINTENANCE_CHECK_INTERVAL_MS, self._idle_maintenance)
+
+    # ---------- Menu ----------
+    def _build_menu(self):
+        menubar = tk.Menu(self)
+
+        file_menu = tk.Menu(menubar, tearoff=0)
+        file_menu.add_command(label="Back Up Now", command=self.backup_now)
+        file_menu.add_command(label="Restore From Backup...", command=self.restore_backup)
+        file_menu.add_separator()
+        file_menu.add_command(label="Archive Closed Year...", command=self.archive_year_clicked)
+        file_menu.add_command(label="Restore Archived Year...", command=self.restore_year_clicked)
+        file_menu.add_separator()
+        file_menu.add_command(label="Load Exchange Rates...", command=self.load_rates_clicked)
+        file_menu.add_separator()
+        file_menu.add_command(label="Run Maintenance Now", command=self.maintenance_now)
+        file_menu.add_separator()
+        file_menu.add_command(label="Exit", command=self.destroy)
+        menubar.add_cascade(label="File", menu=file_menu)
+
+        self.config(menu=menubar)
+
     # ---------- UI Layout ----------
     def _build_ui(self):
         self.notebook = ttk.Notebook(self)
@@ -114,21 +240,27 @@ class ExpenseTrackerGUI(tk.Tk):
         self.month_combo.pack(side="left", padx=8)
         self.month_combo.bind("<<ComboboxSelected>>", lambda e: self.refresh_all())
 
-        ttk.Label(top, text="Global Salary ($):").pack(side="left", padx=(20, 0))
+        ttk.Label(top, text="Income Source:").pack(side="left", padx=(20, 0))
+        self.income_source_combo = ttk.Combobox(top, textvariable=self.income_source_var, width=14)
+        self.income_source_combo.pack(side="left", padx=8)
+        self.income_source_combo.bind("<<ComboboxSelected>>", lambda e: self.refresh_salary())
+
+        ttk.Label(top, text="Monthly Amount ($):").pack(side="left")
         self.salary_entry = ttk.Entry(top, textvariable=self.salary_var, width=12)
         self.salary_entry.pack(side="left", padx=8)
-        ttk.Button(top, text="Save Salary", command=self.save_salary).pack(side="left")
+        ttk.Button(top, text="Save From This Month", command=self.save_salary).pack(side="left")
 
         # Add expense form
         form = ttk.LabelFrame(self.tab_expenses, text="Add Expense")
         form.pack(fill="x", padx=10, pady=10)
 
         self.amount_e = ttk.Entry(form, width=12)
-        self.category_e = ttk.Entry(form, width=18)
+        self.category_e = CategoryCombobox(form, self.category_index, width=18)
         self.date_e = ttk.Entry(form, width=14)
         self.note_e = ttk.Entry(form, width=50)
+        self.currency_e = ttk.Combobox(form, width=6, state="readonly")
 
-        ttk.Label(form, text="Amount ($)").grid(row=0, column=0, padx=6, pady=6, sticky="w")
+        ttk.Label(form, text="Amount").grid(row=0, column=0, padx=6, pady=6, sticky="w")
         self.amount_e.grid(row=0, column=1, padx=6, pady=6)
 
         ttk.Label(form, text="Category").grid(row=0, column=2, padx=6, pady=6, sticky="w")
@@ -137,6 +269,10 @@ class ExpenseTrackerGUI(tk.Tk):
         ttk.Label(form, text="Date (YYYY-MM-DD)").grid(row=0, column=4, padx=6, pady=6, sticky="w")
         self.date_e.grid(row=0, column=5, padx=6, pady=6)
 
+        ttk.Label(form, text="Currency").grid(row=0, column=6, padx=6, pady=6, sticky="w")
+        self.currency_e.grid(row=0, column=7, padx=6, pady=6)
+        self.refresh_currencies()
+
         ttk.Label(form, text="Note").grid(row=1, column=0, padx=6, pady=6, sticky="w")
         self.note_e.grid(row=1, column=1, columnspan=5, padx=6, pady=6, sticky="we")
 
@@ -151,12 +287,12 @@ class ExpenseTrackerGUI(tk.Tk):
         table_frame.pack(fill="both", expand=True, padx=10, pady=10)
 
         cols = ("id", "date", "category", "amount", "note")
-        self.tree = ttk.Treeview(table_frame, columns=cols, show="headings", height=16)
+        self.tree = ttk.Treeview(table_frame, columns=cols, show="headings", height=16, selectmode="extended")
 
         self.tree.heading("id", text="ID")
         self.tree.heading("date", text="Date")
         self.tree.heading("category", text="Category")
-        self.tree.heading("amount", text="Amount ($)")
+        self.tree.heading("amount", text="Amount")
         self.tree.heading("note", text="Note")
 
         self.tree.column("id", width=60, anchor="center")
@@ -173,18 +309,30 @@ class ExpenseTrackerGUI(tk.Tk):
 
         btns = ttk.Frame(self.tab_expenses)
         btns.pack(fill="x", padx=10, pady=(0, 10))
-        ttk.Button(btns, text="Delete Selected Expense", command=self.delete_selected_expense).pack(side="left")
+        ttk.Button(btns, text="Delete Selected", command=self.delete_selected_expense).pack(side="left")
+        ttk.Button(btns, text="Change Category...", command=self.recategorize_selected_expenses).pack(
+            side="left", padx=10
+        )
+        ttk.Button(btns, text="Shift Dates...", command=self.shift_selected_expenses).pack(side="left")
 
     # ---------- Fixed Expenses Tab ----------
     def _build_fixed_tab(self):
-        form = ttk.LabelFrame(self.tab_fixed, text="Add Fixed Expense (recurs monthly)")
+        form = ttk.LabelFrame(self.tab_fixed, text="Add Fixed Expense (recurring)")
         form.pack(fill="x", padx=10, pady=10)
 
         self.fixed_name = ttk.Entry(form, width=20)
         self.fixed_amount = ttk.Entry(form, width=12)
-        self.fixed_category = ttk.Entry(form, width=16)
+        self.fixed_category = CategoryCombobox(form, self.category_index, width=16)
         self.fixed_start = ttk.Entry(form, width=10)
         self.fixed_end = ttk.Entry(form, width=10)
+        self.fixed_repeat = ttk.Combobox(
+            form, width=10, state="readonly",
+            values=[p.capitalize() for p in RECURRENCE_PRESETS] + ["Custom"],
+        )
+        self.fixed_repeat.set("Monthly")
+        self.fixed_every = ttk.Entry(form, width=5)
+        self.fixed_unit = ttk.Combobox(form, width=8, state="readonly", values=INTERVAL_UNITS)
+        self.fixed_unit.set("month")
 
         ttk.Label(form, text="Name").grid(row=0, column=0, padx=6, pady=6, sticky="w")
         self.fixed_name.grid(row=0, column=1, padx=6, pady=6)
@@ -201,6 +349,13 @@ class ExpenseTrackerGUI(tk.Tk):
         ttk.Label(form, text="End (optional YYYY-MM)").grid(row=1, column=2, padx=6, pady=6, sticky="w")
         self.fixed_end.grid(row=1, column=3, padx=6, pady=6)
 
+        ttk.Label(form, text="Repeats").grid(row=0, column=6, padx=6, pady=6, sticky="w")
+        self.fixed_repeat.grid(row=0, column=7, padx=6, pady=6)
+
+        ttk.Label(form, text="Custom: every").grid(row=1, column=4, padx=6, pady=6, sticky="w")
+        self.fixed_every.grid(row=1, column=5, padx=6, pady=6, sticky="w")
+        self.fixed_unit.grid(row=1, column=6, padx=6, pady=6, sticky="w")
+
         ttk.Button(form, text="Add Fixed Expense", command=self.add_fixed_clicked).grid(
             row=2, column=0, padx=6, pady=8, sticky="w"
         )
@@ -209,14 +364,16 @@ class ExpenseTrackerGUI(tk.Tk):
         table_frame = ttk.Frame(self.tab_fixed)
         table_frame.pack(fill="both", expand=True, padx=10, pady=10)
 
-        cols = ("id", "name", "category", "amount", "start", "end", "active")
-        self.fixed_tree = ttk.Treeview(table_frame, columns=cols, show="headings", height=16)
+        cols = ("id", "name", "category", "amount", "repeats", "start", "end", "active")
+        self.fixed_tree = ttk.Treeview(table_frame, columns=cols, show="headings", height=16,
+                                       selectmode="extended")
 
         headings = [
             ("id", "ID", 60),
             ("name", "Name", 180),
             ("category", "Category", 150),
             ("amount", "Amount ($)", 120),
+            ("repeats", "Repeats", 130),
             ("start", "Start", 100),
             ("end", "End", 100),
             ("active", "Active", 90),
@@ -236,6 +393,8 @@ class ExpenseTrackerGUI(tk.Tk):
 
         ttk.Button(btns, text="Toggle Active", command=self.toggle_fixed_active).pack(side="left")
         ttk.Button(btns, text="Delete Selected", command=self.delete_fixed_selected).pack(side="left", padx=10)
+        ttk.Button(btns, text="Change Category...", command=self.recategorize_fixed_selected).pack(side="left")
+        ttk.Button(btns, text="Shift Months...", command=self.shift_fixed_selected).pack(side="left", padx=10)
 
     # ---------- Insights Tab ----------
     def _build_insights_tab(self):
@@ -278,9 +437,6 @@ class ExpenseTrackerGUI(tk.Tk):
 
         self._set_months_in_combo(default_month)
 
-        # Salary load
-        self.salary_var.set(cents_to_money_str(get_global_salary_cents()))
-
         # Default date for quick entry
         self.date_e.insert(0, datetime.now().strftime("%Y-%m-%d"))
 
@@ -300,56 +456,66 @@ class ExpenseTrackerGUI(tk.Tk):
 
     # ---------- Refresh / Update ----------
     def refresh_all(self):
+        self.refresh_salary()
         self.refresh_expenses_table()
         self.refresh_fixed_table()
         self.refresh_charts()
 
+    def refresh_salary(self):
+        sources = dict(income_sources_for_month(self.selected_month.get()))
+        source = self.income_source_var.get().strip()
+
+        names = list(sources)
+        if DEFAULT_INCOME_SOURCE not in names:
+            names.insert(0, DEFAULT_INCOME_SOURCE)
+        self.income_source_combo["values"] = names
+        self.salary_var.set(cents_to_money_str(sources.get(source, 0)))
+
     def refresh_expenses_table(self):
         month = self.selected_month.get()
-        rows = list_expenses_for_month(month)
-
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        for r in rows:
-            self.tree.insert("", "end", values=(
-                r["id"],
-                r["expense_date"],
-                r["category"],
-                f"{r['amount_cents'] / 100:.2f}",
-                r["note"] or ""
-            ))
+
+        self.tree.delete(*self.tree.get_children())
+
+        insert = self.tree.insert
+        for r in iter_expenses_for_month(month):
+            amount = f"{r.amount} {r.currency}" if r.currency else r.amount
+            insert("", "end", values=(r.id, r.expense_date, r.category, amount, r.note or ""))
 
     def refresh_fixed_table(self):
-        for item in self.fixed_tree.get_children():
-            self.fixed_tree.delete(item)
+        self.fixed_tree.delete(*self.fixed_tree.get_children())
 
-        rows = list_fixed_expenses()
-        for r in rows:
+        for r in iter_fixed_expenses():
             self.fixed_tree.insert("", "end", values=(
-                r["id"],
-                r["name"],
-                r["category"],
-                f"{r['amount_cents'] / 100:.2f}",
-                r["start_month"],
-                r["end_month"] or "",
-                "Yes" if r["active"] == 1 else "No"
+                r.id,
+                r.name,
+                r.category,
+                r.amount,
+                describe_recurrence(r.interval_unit, r.interval_count),
+                r.start_month,
+                r.end_month or "",
+                "Yes" if r.active == 1 else "No"
             ))
 
     def refresh_charts(self):
         month = self.selected_month.get()
 
         # Insights numbers (salary - (fixed + variable))
-        salary, variable, fixed, total_spend, net = income_vs_spend(month)
+        _, salary, variable, fixed, total_spend, net = income_vs_spend(month)
+
+        sources = income_sources_for_month(month)
+        income_detail = ""
+        if len(sources) > 1:
+            income_detail = " (" + ", ".join(f"{name} ${cents/100:.2f}" for name, cents in sources) + ")"
 
         self.summary_label.config(
             text=(
                 f"Month: {month}   "
-                f"Income: ${salary/100:.2f}   "
+                f"Income: ${salary/100:.2f}{income_detail}   "
                 f"Fixed: ${fixed/100:.2f}   "
                 f"Variable: ${variable/100:.2f}   "
                 f"Total: ${total_spend/100:.2f}   "
-                f"Net: ${net/100:.2f}"
+                f"Net: ${net/100:.2f}\n"
+                + describe_forecast(forecast_month(month))
             )
         )
 
@@ -402,7 +568,8 @@ class ExpenseTrackerGUI(tk.Tk):
             date = validate_date(self.date_e.get())
             note = self.note_e.get().strip() or None
 
-            add_expense(amount_cents, category, date, note)
+            add_expense(amount_cents, category, date, note, self.currency_e.get())
+            self.category_index.add(category)
 
             # Clear amount/category/note (keep date)
             self.amount_e.delete(0, tk.END)
@@ -418,28 +585,75 @@ class ExpenseTrackerGUI(tk.Tk):
         except Exception as e:
             messagebox.showerror("Add Expense Error", str(e))
 
+    @staticmethod
+    def _selected_ids(tree) -> list:
+        # ids of every selected row (the id is the first column in both tables)
+        return [int(tree.set(item, "id")) for item in tree.selection()]
+
+    def _after_bulk_edit(self, changed: int, requested: int, title: str):
+        # One refresh for the whole batch
+        self.category_index.reset(category_usage_counts())
+        self._set_months_in_combo(self.selected_month.get())
+        self.refresh_all()
+        if changed < requested:
+            messagebox.showinfo(title, f"{changed} of {requested} rows changed "
+                                       "(archived years are read-only).")
+
     def delete_selected_expense(self):
-        sel = self.tree.selection()
-        if not sel:
-            messagebox.showinfo("Delete", "Select an expense row first.")
+        ids = self._selected_ids(self.tree)
+        if not ids:
+            messagebox.showinfo("Delete", "Select one or more expense rows first.")
             return
 
-        item = self.tree.item(sel[0])
-        expense_id = int(item["values"][0])
+        prompt = f"Delete expense ID {ids[0]}?" if len(ids) == 1 else f"Delete {len(ids)} expenses?"
+        if messagebox.askyesno("Confirm Delete", prompt):
+            self._after_bulk_edit(delete_expenses(ids), len(ids), "Delete")
 
-        if messagebox.askyesno("Confirm Delete", f"Delete expense ID {expense_id}?"):
-            ok = delete_expense(expense_id)
-            if ok:
-                self._set_months_in_combo(self.selected_month.get())
-                self.refresh_all()
+    def recategorize_selected_expenses(self):
+        ids = self._selected_ids(self.tree)
+        if not ids:
+            messagebox.showinfo("Change Category", "Select one or more expense rows first.")
+            return
+
+        category = simpledialog.askstring(
+            "Change Category", f"New category for {len(ids)} expense(s):", parent=self
+        )
+        if category is None:
+            return
+        try:
+            self._after_bulk_edit(recategorize_expenses(ids, category), len(ids), "Change Category")
+        except Exception as e:
+            messagebox.showerror("Change Category Error", str(e))
+
+    def shift_selected_expenses(self):
+        ids = self._selected_ids(self.tree)
+        if not ids:
+            messagebox.showinfo("Shift Dates", "Select one or more expense rows first.")
+            return
+
+        days = simpledialog.askinteger(
+            "Shift Dates", f"Move {len(ids)} expense(s) by how many days? (negative = earlier)", parent=self
+        )
+        if not days:
+            return
+        try:
+            self._after_bulk_edit(shift_expense_dates(ids, days), len(ids), "Shift Dates")
+        except Exception as e:
+            messagebox.showerror("Shift Dates Error", str(e))
 
     # ---------- Actions: Salary ----------
     def save_salary(self):
         try:
+            source = self.income_source_var.get().strip()
+            if not source:
+                raise ValueError("Income source cannot be empty.")
+
             salary_cents = money_to_cents_allow_zero(self.salary_var.get())
-            set_global_salary_cents(salary_cents)
+            month = self.selected_month.get()
+            set_income(source, month, salary_cents)
+            self.refresh_salary()
             self.refresh_charts()
-            messagebox.showinfo("Salary", "Salary saved.")
+            messagebox.showinfo("Salary", f"{source} saved from {month} onwards.")
         except Exception as e:
             messagebox.showerror("Salary Error", str(e))
 
@@ -464,13 +678,23 @@ class ExpenseTrackerGUI(tk.Tk):
             if end and end < start:
                 raise ValueError("End month cannot be earlier than start month.")
 
-            add_fixed_expense(name, amount_cents, category, start, end)
+            repeat = self.fixed_repeat.get().lower()
+            if repeat == "custom":
+                every_raw = self.fixed_every.get().strip()
+                interval_count = int(every_raw) if every_raw else 1
+                interval_unit = self.fixed_unit.get()
+            else:
+                interval_unit, interval_count = RECURRENCE_PRESETS[repeat]
+
+            add_fixed_expense(name, amount_cents, category, start, end, interval_unit, interval_count)
+            self.category_index.add(category)
 
             self.fixed_name.delete(0, tk.END)
             self.fixed_amount.delete(0, tk.END)
             self.fixed_category.delete(0, tk.END)
             # keep start for convenience
             self.fixed_end.delete(0, tk.END)
+            self.fixed_every.delete(0, tk.END)
 
             self.refresh_all()
 
@@ -485,24 +709,215 @@ class ExpenseTrackerGUI(tk.Tk):
 
         item = self.fixed_tree.item(sel[0])
         fixed_id = int(item["values"][0])
-        active_text = item["values"][6]
+        active_text = item["values"][7]
         is_active = True if active_text == "Yes" else False
 
         set_fixed_active(fixed_id, not is_active)
         self.refresh_all()
 
     def delete_fixed_selected(self):
-        sel = self.fixed_tree.selection()
-        if not sel:
-            messagebox.showinfo("Delete", "Select a fixed expense first.")
+        ids = self._selected_ids(self.fixed_tree)
+        if not ids:
+            messagebox.showinfo("Delete", "Select one or more fixed expenses first.")
             return
 
-        item = self.fixed_tree.item(sel[0])
-        fixed_id = int(item["values"][0])
+        prompt = f"Delete fixed expense ID {ids[0]}?" if len(ids) == 1 else f"Delete {len(ids)} fixed expenses?"
+        if messagebox.askyesno("Confirm Delete", prompt):
+            self._after_bulk_edit(delete_fixed_expenses(ids), len(ids), "Delete")
+
+    def recategorize_fixed_selected(self):
+        ids = self._selected_ids(self.fixed_tree)
+        if not ids:
+            messagebox.showinfo("Change Category", "Select one or more fixed expenses first.")
+            return
 
-        if messagebox.askyesno("Confirm Delete", f"Delete fixed expense ID {fixed_id}?"):
-            delete_fixed_expense(fixed_id)
+        category = simpledialog.askstring(
+            "Change Category", f"New category for {len(ids)} fixed expense(s):", parent=self
+        )
+        if category is None:
+            return
+        try:
+            self._after_bulk_edit(recategorize_fixed_expenses(ids, category), len(ids), "Change Category")
+        except Exception as e:
+            messagebox.showerror("Change Category Error", str(e))
+
+    def shift_fixed_selected(self):
+        ids = self._selected_ids(self.fixed_tree)
+        if not ids:
+            messagebox.showinfo("Shift Months", "Select one or more fixed expenses first.")
+            return
+
+        months = simpledialog.askinteger(
+            "Shift Months", f"Move {len(ids)} fixed expense(s) by how many months? (negative = earlier)",
+            parent=self,
+        )
+        if not months:
+            return
+        try:
+            self._after_bulk_edit(shift_fixed_months(ids, months), len(ids), "Shift Months")
+        except Exception as e:
+            messagebox.showerror("Shift Months Error", str(e))
+
+    # ---------- Actions: Backup ----------
+    def _run_backup_in_background(self, job, on_done):
+        # Backups copy in short paged steps on a worker thread; Tk is only
+        # touched from the main thread via the poll below.
+        if self._backup_thread and self._backup_thread.is_alive():
+            return False
+
+        def worker():
+            try:
+                self._backup_result = (job(), None)
+            except Exception as e:
+                self._backup_result = (None, e)
+
+        self._backup_result = None
+        self._backup_thread = threading.Thread(target=worker, daemon=True)
+        self._backup_thread.start()
+        self.after(BACKUP_POLL_MS, lambda: self._poll_backup(on_done))
+        return True
+
+    def _poll_backup(self, on_done):
+        if self._backup_thread.is_alive():
+            self.after(BACKUP_POLL_MS, lambda: self._poll_backup(on_done))
+            return
+        result, error = self._backup_result
+        on_done(result, error)
+
+    def _scheduled_backup(self):
+        self._run_backup_in_background(run_scheduled_snapshot, lambda result, error: None)
+        self.after(BACKUP_CHECK_INTERVAL_MS, self._scheduled_backup)
+
+    def backup_now(self):
+        def done(path, error):
+            if error:
+                messagebox.showerror("Backup Error", str(error))
+            else:
+                messagebox.showinfo("Backup", f"Backup saved to:\n{path}")
+
+        if not self._run_backup_in_background(lambda: create_snapshot(compress=True), done):
+            messagebox.showinfo("Backup", "A backup is already running.")
+
+    def restore_backup(self):
+        folder = filedialog.askdirectory(title="Choose a backup snapshot", initialdir=BACKUPS_DIR)
+        if not folder:
+            return
+        if not messagebox.askyesno("Confirm Restore", "Replace all current data with this backup?"):
+            return
+
+        def done(_, error):
+            if error:
+                messagebox.showerror("Restore Error", str(error))
+                return
+            self.category_index.reset(category_usage_counts())
+            self.refresh_currencies()
+            self._set_months_in_combo(self.selected_month.get())
             self.refresh_all()
+            messagebox.showinfo("Restore", "Backup restored.")
+
+        if not self._run_backup_in_background(lambda: restore_snapshot(folder), done):
+            messagebox.showinfo("Restore", "A backup is already running.")
+
+    # ---------- Actions: Exchange Rates ----------
+    def refresh_currencies(self):
+        # Base currency first; it stays selected unless the user picks another
+        currencies = list_currencies()
+        self.currency_e["values"] = currencies
+        if self.currency_e.get() not in currencies:
+            self.currency_e.set(currencies[0])
+
+    def load_rates_clicked(self):
+        paths = filedialog.askopenfilenames(
+            title="Exchange rate files (date,currency,rate)",
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
+        )
+        if not paths:
+            return
+        try:
+            loaded = sum(load_exchange_rates(path) for path in paths)
+            self.refresh_currencies()
+            self.refresh_all()
+            messagebox.showinfo("Exchange Rates", f"Loaded {loaded} rates from {len(paths)} file(s).")
+        except Exception as e:
+            messagebox.showerror("Exchange Rates Error", str(e))
+
+    # ---------- Actions: Maintenance ----------
+    def _note_activity(self, _event=None):
+        self._last_activity = time.monotonic()
+
+    def _idle_maintenance(self):
+        idle = time.monotonic() - self._last_activity >= MAINTENANCE_IDLE_SECONDS
+        if idle and self._maintenance is None and maintenance_due():
+            self._start_maintenance(on_done=None)
+        self.after(MAINTENANCE_CHECK_INTERVAL_MS, self._idle_maintenance)
+
+    def _start_maintenance(self, on_done):
+        self._maintenance = iter_maintenance()
+        self._maintenance_steps = []
+        self._maintenance_started = time.monotonic()
+        self.after_idle(lambda: self._maintenance_slice(on_done))
+
+    def _maintenance_slice(self, on_done):
+        # Background runs stop as soon as the user is back; the next idle
+        # period starts over (each finished slice is already committed).
+        if on_done is None and time.monotonic() - self._last_activity < MAINTENANCE_IDLE_SECONDS:
+            self._maintenance.close()
+            self._maintenance = None
+            return
+
+        try:
+            self._maintenance_steps.append(next(self._maintenance))
+        except StopIteration:
+            self._maintenance = None
+            if on_done:
+                on_done(self._maintenance_steps, time.monotonic() - self._maintenance_started)
+            return
+        except Exception as e:
+            self._maintenance = None
+            if on_done:
+                messagebox.showerror("Maintenance Error", str(e))
+            return
+
+        self.after(MAINTENANCE_SLICE_GAP_MS, lambda: self._maintenance_slice(on_done))
+
+    def maintenance_now(self):
+        if self._maintenance is not None:
+            messagebox.showinfo("Maintenance", "Maintenance is already running.")
+            return
+
+        def done(steps, seconds):
+            report = "\n".join(summarize_steps(steps))
+            messagebox.showinfo("Maintenance", f"Finished in {seconds:.2f} s\n\n{report}")
+
+        self._start_maintenance(on_done=done)
+
+    # ---------- Actions: Archive ----------
+    def archive_year_clicked(self):
+        archived = ", ".join(str(y) for y, _ in list_archived_years()) or "none"
+        year = simpledialog.askinteger(
+            "Archive Year", f"Year to archive (already archived: {archived}):", parent=self
+        )
+        if year is None:
+            return
+        try:
+            moved = archive_year(year)
+            self._set_months_in_combo(self.selected_month.get())
+            self.refresh_all()
+            messagebox.showinfo("Archive", f"Archived {moved} expenses from {year}.")
+        except Exception as e:
+            messagebox.showerror("Archive Error", str(e))
+
+    def restore_year_clicked(self):
+        year = simpledialog.askinteger("Restore Year", "Archived year to restore:", parent=self)
+        if year is None:
+            return
+        try:
+            restored = restore_year(year)
+            self._set_months_in_combo(self.selected_month.get())
+            self.refresh_all()
+            messagebox.showinfo("Archive", f"Restored {restored} expenses from {year}.")
+        except Exception as e:
+            messagebox.showerror("Archive Error", str(e))
 
 
 if __name__ == "__main__":
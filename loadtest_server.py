@@ -0,0 +1,158 @@
+"""Load test for server.py against a synthetic ledger.
+
+Builds a throwaway database in a temporary APPDATA, starts the server on a
+free port and hammers it with concurrent keep-alive clients:
+
+    python loadtest_server.py --expenses 200000 --clients 32 --seconds 10
+
+The ledger doesn't change during the run, so after the first pass most
+responses come from the server's response cache; --no-cache makes every
+request a distinct URL without If-None-Match, so each one runs its queries
+on the read-only pool.
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+# Makes every URL unique with --no-cache
+REQUEST_NUMBERS = itertools.count()
+
+
+def build_ledger(expenses: int, months: int, seed: int):
+    from db import get_connection, add_fixed_expense, set_income, add_months
+
+    rng = random.Random(seed)
+    categories = ["Food", "Transport", "Rent", "Fun", "Health", "Bills", "Travel", "Gifts"]
+    last = time.strftime("%Y-%m")
+    first = add_months(last, -(months - 1))
+    month_list = [add_months(first, i) for i in range(months)]
+
+    rows = [
+        (rng.randint(100, 20000), rng.choice(categories),
+         f"{rng.choice(month_list)}-{rng.randint(1, 28):02d}", None)
+        for _ in range(expenses)
+    ]
+    with get_connection() as conn:
+        conn.executemany("""
+            INSERT INTO expenses (amount_cents, category, expense_date, note)
+            VALUES (?, ?, ?, ?);
+        """, rows)
+        conn.commit()
+
+    set_income("Salary", first, 500000)
+    add_fixed_expense("Rent", 150000, "Rent", first, None)
+    add_fixed_expense("Gym", 2500, "Health", first, None, "week", 1)
+    return month_list
+
+
+async def client(port, paths, deadline, latencies, counts, etags, no_cache):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        while time.perf_counter() < deadline:
+            path = random.choice(paths)
+            if no_cache:
+                # unknown parameters are ignored by the endpoints but make
+                # the URL (the response cache key) unique
+                target = f"{path}{'&' if '?' in path else '?'}n={next(REQUEST_NUMBERS)}"
+                headers = f"GET {target} HTTP/1.1\r\nHost: localhost\r\n"
+            else:
+                headers = f"GET {path} HTTP/1.1\r\nHost: localhost\r\n"
+                # revalidate about half of the requests, like a polling dashboard
+                if path in etags and random.random() < 0.5:
+                    headers += f"If-None-Match: {etags[path]}\r\n"
+            start = time.perf_counter()
+            writer.write((headers + "\r\n").encode("latin-1"))
+            await writer.drain()
+
+            head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1")
+            status = int(head.split()[1])
+            length = 0
+            for line in head.split("\r\n")[1:]:
+                name, _, value = line.partition(":")
+                if name.lower() == "content-length":
+                    length = int(value)
+                elif name.lower() == "etag":
+                    etags[path] = value.strip()
+            if length:
+                await reader.readexactly(length)
+
+            latencies.append(time.perf_counter() - start)
+            counts[status] = counts.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def run_load(port, months, clients, seconds, no_cache=False):
+    endpoints = ["/api/expenses", "/api/category-breakdown",
+                 "/api/combined-category-breakdown", "/api/daily-totals",
+                 "/api/monthly-total", "/api/income-vs-spend"]
+    paths = [f"{e}?month={m}" for e in endpoints for m in months] + ["/api/months"]
+
+    latencies, counts, etags = [], {}, {}
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, paths, deadline, latencies, counts, etags, no_cache)
+                           for _ in range(clients)))
+    return time.perf_counter() - start, latencies, counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--expenses", type=int, default=100_000)
+    parser.add_argument("--months", type=int, default=36)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-cache", action="store_true",
+                        help="make every request miss the response cache (measures the query pool)")
+    args = parser.parse_args()
+
+    # db.py picks its location up from APPDATA at import time
+    os.environ["APPDATA"] = tempfile.mkdtemp(prefix="expense-loadtest-")
+    from db import init_db
+    from server import serve
+
+    init_db()
+    t = time.perf_counter()
+    months = build_ledger(args.expenses, args.months, args.seed)
+    print(f"Ledger: {args.expenses} expenses over {args.months} months "
+          f"built in {time.perf_counter() - t:.1f}s ({os.environ['APPDATA']})")
+
+    ready = threading.Event()
+    port_box = []
+
+    def on_ready(port):
+        port_box.append(port)
+        ready.set()
+
+    threading.Thread(
+        target=lambda: asyncio.run(serve("127.0.0.1", 0, args.pool_size, on_ready)),
+        daemon=True,
+    ).start()
+    if not ready.wait(10):
+        sys.exit("server did not start")
+
+    elapsed, latencies, counts = asyncio.run(run_load(port_box[0], months, args.clients, args.seconds, args.no_cache))
+
+    total = len(latencies)
+    latencies.sort()
+    print(f"Clients: {args.clients}, pool size: {args.pool_size}, duration: {elapsed:.1f}s, "
+          f"response cache: {'bypassed' if args.no_cache else 'used'}")
+    print(f"Requests: {total}  ({total / elapsed:.0f} req/s)")
+    print("Status: " + ", ".join(f"{k}={v}" for k, v in sorted(counts.items())))
+    if latencies:
+        print(f"Latency ms: p50={statistics.median(latencies) * 1000:.2f} "
+              f"p95={latencies[int(total * 0.95) - 1] * 1000:.2f} "
+              f"max={latencies[-1] * 1000:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import time
+from datetime import datetime, timedelta
+from typing import Iterator, Tuple
+
+from db import DB_FILE, get_connection, close_connection
+
+# Pages released per incremental_vacuum slice; small enough that one
+# slice never holds the write lock (or the GUI thread) for long.
+INCREMENTAL_VACUUM_PAGES = 256
+
+# Upper bound on rows ANALYZE samples per index, keeps ANALYZE short on big tables
+ANALYSIS_LIMIT = 1000
+
+MAINTENANCE_INTERVAL = timedelta(days=7)
+# Run early once this much space is sitting on the freelist (e.g. after bulk deletes)
+FREELIST_THRESHOLD_BYTES = 1024 * 1024
+
+# (step, seconds, detail)
+StepResult = Tuple[str, float, str]
+
+
+def _db_size() -> int:
+    # Database plus its WAL, which is where recent writes live until a checkpoint
+    wal = DB_FILE.with_name(DB_FILE.name + "-wal")
+    return sum(p.stat().st_size for p in (DB_FILE, wal) if p.exists())
+
+
+def _freelist_bytes(conn) -> int:
+    free_pages = conn.execute("PRAGMA freelist_count;").fetchone()[0]
+    page_size = conn.execute("PRAGMA page_size;").fetchone()[0]
+    return free_pages * page_size
+
+
+def _last_run(conn):
+    row = conn.execute("""
+        SELECT value FROM settings WHERE key = 'last_maintenance_at';
+    """).fetchone()
+    return datetime.fromisoformat(row[0]) if row else None
+
+
+def maintenance_due() -> bool:
+    with get_connection() as conn:
+        last = _last_run(conn)
+        if last is None or datetime.now() - last >= MAINTENANCE_INTERVAL:
+            return True
+        return _freelist_bytes(conn) >= FREELIST_THRESHOLD_BYTES
+
+
+def iter_maintenance() -> Iterator[StepResult]:
+    # Runs maintenance one short slice at a time; the caller decides when
+    # to resume (the GUI spreads slices over idle callbacks).
+    conn = get_connection()
+    try:
+        t = time.perf_counter()
+        conn.execute(f"PRAGMA analysis_limit={ANALYSIS_LIMIT};")
+        conn.execute("PRAGMA optimize;")
+        yield "optimize", time.perf_counter() - t, ""
+
+        t = time.perf_counter()
+        conn.execute("ANALYZE;")
+        conn.commit()
+        yield "analyze", time.perf_counter() - t, ""
+
+        page_size = conn.execute("PRAGMA page_size;").fetchone()[0]
+        while True:
+            free_pages = conn.execute("PRAGMA freelist_count;").fetchone()[0]
+            if free_pages == 0:
+                break
+            t = time.perf_counter()
+            # executescript steps the pragma to completion; execute() would
+            # free a single page per call
+            conn.executescript(f"PRAGMA incremental_vacuum({INCREMENTAL_VACUUM_PAGES});")
+            step = free_pages - conn.execute("PRAGMA freelist_count;").fetchone()[0]
+            if step <= 0:
+                break  # auto_vacuum is not INCREMENTAL on this file
+            yield "incremental_vacuum", time.perf_counter() - t, f"{step * page_size} bytes"
+
+        t = time.perf_counter()
+        busy, log_pages, checkpointed = conn.execute("PRAGMA wal_checkpoint(TRUNCATE);").fetchone()
+        detail = "busy, retry later" if busy else f"{checkpointed} of {log_pages} pages"
+        yield "wal_checkpoint", time.perf_counter() - t, detail
+
+        conn.execute("""
+            INSERT INTO settings (key, value)
+            VALUES ('last_maintenance_at', ?)
+            ON CONFLICT(key) DO UPDATE SET value=excluded.value;
+        """, (datetime.now().isoformat(timespec="seconds"),))
+        conn.commit()
+    finally:
+        close_connection(conn)
+
+
+def run_maintenance():
+    # Runs every step in one go. Returns (steps, seconds, freed_bytes).
+    size_before = _db_size()
+    start = time.perf_counter()
+    steps = list(iter_maintenance())
+    seconds = time.perf_counter() - start
+    return steps, seconds, max(size_before - _db_size(), 0)
+
+
+def summarize_steps(steps) -> list:
+    # Collapses the per-slice vacuum rows into one line per step
+    merged = {}
+    for step, seconds, detail in steps:
+        total, details = merged.get(step, (0.0, []))
+        merged[step] = (total + seconds, details + ([detail] if detail else []))
+
+    lines = []
+    for step, (seconds, details) in merged.items():
+        if step == "incremental_vacuum":
+            freed = sum(int(d.split()[0]) for d in details)
+            text = f"{len(details)} slices, {freed} bytes"
+        else:
+            text = "; ".join(details)
+        lines.append(f"{step}: {seconds * 1000:.1f} ms" + (f" ({text})" if text else ""))
+    return lines
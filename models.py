@@ -0,0 +1,100 @@
+from functools import partial
+from typing import List, NamedTuple, Optional
+
+
+# Plain tuples underneath: no per-row dict or description lookups, and
+# attribute access is a C-level index. Field order matches the SELECTs in db.py.
+
+class Expense(NamedTuple):
+    id: int
+    amount_cents: int
+    category: str
+    expense_date: str
+    note: Optional[str]
+    currency: Optional[str]  # None = base currency
+
+    @property
+    def amount(self) -> str:
+        return f"{self.amount_cents / 100:.2f}"
+
+
+class ConvertedExpense(NamedTuple):
+    # Expense plus its amount in base-currency cents, converted in SQL
+    id: int
+    amount_cents: int
+    category: str
+    expense_date: str
+    note: Optional[str]
+    currency: Optional[str]
+    base_amount_cents: int
+
+    @property
+    def amount(self) -> str:
+        return f"{self.amount_cents / 100:.2f}"
+
+
+class FixedExpense(NamedTuple):
+    id: int
+    name: str
+    amount_cents: int
+    category: str
+    start_month: str
+    end_month: Optional[str]
+    active: int
+    interval_unit: str
+    interval_count: int
+
+    @property
+    def amount(self) -> str:
+        return f"{self.amount_cents / 100:.2f}"
+
+
+class IncomeEntry(NamedTuple):
+    source: str
+    effective_month: str
+    amount_cents: int
+
+
+class MonthSnapshot(NamedTuple):
+    month: str
+    income_cents: int
+    variable_cents: int
+    fixed_cents: int
+    total_spend_cents: int
+    net_cents: int
+
+
+class Anomaly(NamedTuple):
+    key: str               # day ('YYYY-MM-DD') or category
+    amount_cents: int
+    baseline_cents: int    # what the rolling history predicts
+    score: float           # standard deviations above the baseline
+
+
+class MonthForecast(NamedTuple):
+    month: str
+    as_of: str                     # last day counted as actual spending
+    variable_to_date_cents: int
+    projected_variable_cents: int
+    fixed_cents: int
+    projected_total_cents: int
+    unusual_days: List[Anomaly]
+    unusual_categories: List[Anomaly]
+
+
+EXPENSE_COLUMNS = "id, amount_cents, category, expense_date, note, currency"
+FIXED_EXPENSE_COLUMNS = (
+    "id, name, amount_cents, category, start_month, end_month, active, interval_unit, interval_count"
+)
+
+
+def record_maker(record_type):
+    # tuple.__new__ bound to the record type: builds a record from a plain
+    # sqlite3 row without running any Python code per row (unlike _make).
+    return partial(tuple.__new__, record_type)
+
+
+make_expense = record_maker(Expense)
+make_converted_expense = record_maker(ConvertedExpense)
+make_fixed_expense = record_maker(FixedExpense)
+make_income_entry = record_maker(IncomeEntry)
@@ -1,62 +1,107 @@
 import os
 from pathlib import Path
-import matplotlib.pyplot as plt
 
-from db import get_connection, get_global_salary_cents
-from db import fixed_total_for_month
+from db import get_connection, income_for_month, income_for_month_range
+from db import expenses_table_for_month, expenses_source_for_range, month_range_chunks, base_amount_sql
+from db import fixed_total_for_month, fixed_totals_for_month_range, fixed_category_totals_for_month
+from models import MonthSnapshot
 
 
 APP_DIR = Path(os.getenv("APPDATA", ".")) / "ExpenseTracker"
 REPORTS_DIR = APP_DIR / "reports"
 REPORTS_DIR.mkdir(parents=True, exist_ok=True)
 
+# Expense amounts in base-currency cents (expense tables are aliased "e")
+BASE_AMOUNT = base_amount_sql("e")
+
 
 def monthly_total(month_yyyy_mm: str) -> int:
     with get_connection() as conn:
-        row = conn.execute("""
-            SELECT COALESCE(SUM(amount_cents), 0) AS total
-            FROM expenses
+        table = expenses_table_for_month(conn, month_yyyy_mm)
+        row = conn.execute(f"""
+            SELECT COALESCE(SUM({BASE_AMOUNT}), 0) AS total
+            FROM {table} AS e
             WHERE substr(expense_date, 1, 7) = ?;
         """, (month_yyyy_mm,)).fetchone()
-    return int(row["total"])
+    return int(row[0])
 
 
 def category_breakdown(month_yyyy_mm: str):
     with get_connection() as conn:
-        rows = conn.execute("""
-            SELECT category, SUM(amount_cents) AS total_cents
-            FROM expenses
+        table = expenses_table_for_month(conn, month_yyyy_mm)
+        rows = conn.execute(f"""
+            SELECT category, SUM({BASE_AMOUNT}) AS total_cents
+            FROM {table} AS e
             WHERE substr(expense_date, 1, 7) = ?
             GROUP BY category
             ORDER BY total_cents DESC;
         """, (month_yyyy_mm,)).fetchall()
-    return [(r["category"], int(r["total_cents"])) for r in rows]
+    return [(category, int(total)) for category, total in rows]
 
 
 def daily_totals(month_yyyy_mm: str):
     with get_connection() as conn:
-        rows = conn.execute("""
-            SELECT expense_date, SUM(amount_cents) AS total_cents
-            FROM expenses
+        table = expenses_table_for_month(conn, month_yyyy_mm)
+        rows = conn.execute(f"""
+            SELECT expense_date, SUM({BASE_AMOUNT}) AS total_cents
+            FROM {table} AS e
             WHERE substr(expense_date, 1, 7) = ?
             GROUP BY expense_date
             ORDER BY expense_date ASC;
         """, (month_yyyy_mm,)).fetchall()
-    return [(r["expense_date"], int(r["total_cents"])) for r in rows]
+    return [(day, int(total)) for day, total in rows]
 
 
-def income_vs_spend(month_yyyy_mm: str):
-    salary = get_global_salary_cents()
+def income_vs_spend(month_yyyy_mm: str) -> MonthSnapshot:
+    salary = income_for_month(month_yyyy_mm)
     variable = monthly_total(month_yyyy_mm)
     fixed = fixed_total_for_month(month_yyyy_mm)
     total_spend = variable + fixed
     net = salary - total_spend
-    return salary, variable, fixed, total_spend, net
+    return MonthSnapshot(month_yyyy_mm, salary, variable, fixed, total_spend, net)
+
+
+def monthly_totals_for_range(start_month: str, end_month: str):
+    totals = {}
+    with get_connection() as conn:
+        # chunks never share a month, so their results simply add up
+        for first, last in month_range_chunks(conn, start_month, end_month):
+            source = expenses_source_for_range(conn, first, last)
+            rows = conn.execute(f"""
+                SELECT substr(expense_date, 1, 7) AS month, SUM({BASE_AMOUNT}) AS total_cents
+                FROM {source} AS e
+                WHERE expense_date >= ? AND expense_date < date(? || '-01', '+1 month')
+                GROUP BY month
+                ORDER BY month ASC;
+            """, (first + "-01", last)).fetchall()
+            totals.update((month, int(total)) for month, total in rows)
+    return totals
+
+
+def income_vs_spend_range(start_month: str, end_month: str) -> list:
+    # A MonthSnapshot for every month in the range. Income is resolved for
+    # all months in a single query.
+    variable_by_month = monthly_totals_for_range(start_month, end_month)
+    fixed_by_month = fixed_totals_for_month_range(start_month, end_month)
+
+    result = []
+    for month, salary in income_for_month_range(start_month, end_month):
+        variable = variable_by_month.get(month, 0)
+        fixed = fixed_by_month.get(month, 0)
+        total_spend = variable + fixed
+        result.append(MonthSnapshot(month, salary, variable, fixed, total_spend, salary - total_spend))
+    return result
 
 
 
 # -------- Chart generators (save to AppData/reports) --------
 
+def _pyplot():
+    # Imported on first use so report queries (CLI, scripts) start without matplotlib
+    import matplotlib.pyplot as plt
+    return plt
+
+
 def save_category_pie(month_yyyy_mm: str) -> Path | None:
     data = category_breakdown(month_yyyy_mm)
     if not data:
@@ -65,6 +110,8 @@ def save_category_pie(month_yyyy_mm: str) -> Path | None:
     labels = [c for c, _ in data]
     values = [v / 100 for _, v in data]
 
+    plt = _pyplot()
+
     plt.figure()
     plt.pie(values, labels=labels, autopct="%1.1f%%")
     plt.title(f"Spending by Category ({month_yyyy_mm})")
@@ -83,6 +130,8 @@ def save_daily_line(month_yyyy_mm: str) -> Path | None:
     dates = [d for d, _ in data]
     values = [v / 100 for _, v in data]
 
+    plt = _pyplot()
+
     plt.figure()
     plt.plot(dates, values, marker="o")
     plt.title(f"Daily Spending ({month_yyyy_mm})")
@@ -97,10 +146,12 @@ def save_daily_line(month_yyyy_mm: str) -> Path | None:
 
 
 def save_income_bar(month_yyyy_mm: str) -> Path:
-    salary, spend, net = income_vs_spend(month_yyyy_mm)
+    snapshot = income_vs_spend(month_yyyy_mm)
 
     labels = ["Income", "Expenses", "Net"]
-    values = [salary / 100, spend / 100, net / 100]
+    values = [snapshot.income_cents / 100, snapshot.total_spend_cents / 100, snapshot.net_cents / 100]
+
+    plt = _pyplot()
 
     plt.figure()
     plt.bar(labels, values)
@@ -116,19 +167,8 @@ def combined_category_breakdown(month_yyyy_mm: str):
     # variable categories
     var = category_breakdown(month_yyyy_mm)
 
-    # fixed categories grouped
-    with get_connection() as conn:
-        rows = conn.execute("""
-            SELECT category, COALESCE(SUM(amount_cents), 0) AS total_cents
-            FROM fixed_expenses
-            WHERE active = 1
-              AND start_month <= ?
-              AND (end_month IS NULL OR end_month >= ?)
-            GROUP BY category
-            ORDER BY total_cents DESC;
-        """, (month_yyyy_mm, month_yyyy_mm)).fetchall()
-
-    fixed = [(r["category"], int(r["total_cents"])) for r in rows]
+    # fixed categories grouped (from the precomputed schedule)
+    fixed = fixed_category_totals_for_month(month_yyyy_mm)
 
     # merge
     merged = {}
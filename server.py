@@ -0,0 +1,241 @@
+import argparse
+import asyncio
+import json
+import os
+import queue
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import parse_qs, urlsplit
+
+from db import init_db, connect_readonly, reuse_connection, iter_expenses_for_month, list_months
+from reports import (
+    monthly_total,
+    category_breakdown,
+    combined_category_breakdown,
+    daily_totals,
+    income_vs_spend,
+)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_POOL_SIZE = 4
+
+# Rendered responses kept per data version; dropped as soon as data changes
+RESPONSE_CACHE_SIZE = 256
+
+MAX_HEADER_BYTES = 16 * 1024
+
+
+# ---------- Endpoints (run on pool threads) ----------
+
+def _month_param(params) -> str:
+    month = params.get("month", [""])[0]
+    try:
+        # strptime alone accepts "2024-3", which matches no stored month
+        valid = datetime.strptime(month, "%Y-%m").strftime("%Y-%m") == month
+    except ValueError:
+        valid = False
+    if not valid:
+        raise ValueError(f"invalid month {month!r}, expected ?month=YYYY-MM")  # -> 400
+    return month
+
+
+def _pairs(rows, key):
+    return [{key: k, "amount_cents": v} for k, v in rows]
+
+
+def _expenses(params):
+    return [r._asdict() for r in iter_expenses_for_month(_month_param(params))]
+
+
+def _summary(params):
+    return income_vs_spend(_month_param(params))._asdict()
+
+
+ROUTES = {
+    "/api/months": lambda params: list_months(),
+    "/api/expenses": _expenses,
+    "/api/monthly-total": lambda params: {"amount_cents": monthly_total(_month_param(params))},
+    "/api/category-breakdown": lambda params: _pairs(category_breakdown(_month_param(params)), "category"),
+    "/api/combined-category-breakdown":
+        lambda params: _pairs(combined_category_breakdown(_month_param(params)), "category"),
+    "/api/daily-totals": lambda params: _pairs(daily_totals(_month_param(params)), "date"),
+    "/api/income-vs-spend": _summary,
+}
+
+
+# ---------- Read-only connection pool ----------
+
+class ReaderPool:
+    # N read-only WAL connections, each used by one pool thread at a time.
+    # Queries run off the event loop, so slow ones never stall other clients.
+
+    def __init__(self, size: int):
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="reader")
+        self._connections = queue.SimpleQueue()
+        for _ in range(size):
+            self._connections.put(connect_readonly())
+
+    def _run(self, func, *args):
+        conn = self._connections.get()
+        try:
+            with reuse_connection(conn):
+                return func(*args)
+        finally:
+            conn.rollback()  # end any read transaction before the next user
+            self._connections.put(conn)
+
+    async def run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._run, func, *args)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        while not self._connections.empty():
+            self._connections.get().close()
+
+
+# ---------- HTTP ----------
+
+class ReportServer:
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE):
+        self.pool = ReaderPool(pool_size)
+
+        # PRAGMA data_version changes whenever another connection commits.
+        # Each change starts a new generation; ETags are "<boot>-<generation>"
+        # so they never collide with ones handed out before a restart.
+        self._version_conn = connect_readonly()
+        self._data_version = None
+        self._generation = 0
+        self._boot = os.urandom(4).hex()
+        self._cache = OrderedDict()
+
+    def close(self):
+        self.pool.close()
+        self._version_conn.close()
+
+    def _current_etag(self) -> str:
+        version = self._version_conn.execute("PRAGMA data_version;").fetchone()[0]
+        if version != self._data_version:
+            self._data_version = version
+            self._generation += 1
+            self._cache.clear()
+        return f'"{self._boot}-{self._generation}"'
+
+    async def _respond(self, method: str, target: str, headers: dict):
+        if method not in ("GET", "HEAD"):
+            return 405, {"Allow": "GET, HEAD"}, {"error": "method not allowed"}
+
+        url = urlsplit(target)
+        handler = ROUTES.get(url.path)
+        if handler is None:
+            return 404, {}, {"error": "not found", "endpoints": sorted(ROUTES)}
+
+        etag = self._current_etag()
+        cache_headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if headers.get("if-none-match") == etag:
+            return 304, cache_headers, None
+
+        cached = self._cache.get(target)
+        if cached is not None:
+            self._cache.move_to_end(target)
+            return 200, cache_headers, cached
+
+        try:
+            data = await self.pool.run(handler, parse_qs(url.query))
+        except ValueError as e:
+            return 400, {}, {"error": str(e)}
+
+        body = json.dumps(data).encode("utf-8")
+        if etag == f'"{self._boot}-{self._generation}"':  # data unchanged while querying
+            self._cache[target] = body
+            if len(self._cache) > RESPONSE_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return 200, cache_headers, body
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+
+                lines = head.decode("latin-1").split("\r\n")
+                parts = lines[0].split()
+                if len(parts) != 3:
+                    break
+                method, target, version = parts
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+
+                try:
+                    status, extra, body = await self._respond(method, target, headers)
+                except Exception as e:
+                    status, extra, body = 500, {}, {"error": str(e)}
+                if isinstance(body, dict):
+                    body = json.dumps(body).encode("utf-8")
+
+                keep_alive = (
+                    headers.get("connection", "").lower() != "close"
+                    and version == "HTTP/1.1"
+                )
+                self._write(writer, status, extra, body, method == "HEAD", keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _write(writer, status, extra, body, head_only, keep_alive):
+        reason = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+                  405: "Method Not Allowed", 500: "Internal Server Error"}[status]
+        body = body or b""
+        lines = [f"HTTP/1.1 {status} {reason}"]
+        if status != 304:
+            lines.append("Content-Type: application/json")
+            lines.append(f"Content-Length: {len(body)}")
+        lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+        lines += [f"{k}: {v}" for k, v in extra.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        if status != 304 and not head_only:
+            writer.write(body)
+
+
+async def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                pool_size: int = DEFAULT_POOL_SIZE, ready=None):
+    # ready: optional callback(port) once listening (used by the load test)
+    app = ReportServer(pool_size)
+    server = await asyncio.start_server(app.handle, host, port, limit=MAX_HEADER_BYTES)
+    if ready:
+        ready(server.sockets[0].getsockname()[1])
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        app.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read-only JSON reporting API for Expense Tracker.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--pool-size", type=int, default=DEFAULT_POOL_SIZE,
+                        help="read-only connections / query threads")
+    args = parser.parse_args()
+
+    init_db()  # creates the database and switches it to WAL if needed
+    print(f"Serving on http://{args.host}:{args.port}/api/ (Ctrl+C to stop)")
+    try:
+        asyncio.run(serve(args.host, args.port, args.pool_size))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
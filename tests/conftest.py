@@ -0,0 +1,27 @@
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# db.py picks its location up from APPDATA at import time
+os.environ["APPDATA"] = tempfile.mkdtemp(prefix="expense-tests-")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import db  # noqa: E402
+
+
+@pytest.fixture
+def fresh_db():
+    # Every db call opens its own connection, so removing the files between
+    # tests gives each one an empty ledger
+    for path in db.APP_DIR.iterdir():
+        if path.is_dir():
+            shutil.rmtree(path)
+        else:
+            path.unlink()
+    db._rate_cache.clear()
+    db.init_db()
+    return db
@@ -0,0 +1,90 @@
+from datetime import date
+
+import pytest
+
+
+def test_weekly_and_daily_occurrences_per_month(fresh_db):
+    db = fresh_db
+    # 2024-01-01 is a Monday: five Mondays in January and April, four between
+    assert db.expand_occurrences("2024-01", "week", 1, "2024-01", "2024-04") == {
+        "2024-01": 5, "2024-02": 4, "2024-03": 4, "2024-04": 5,
+    }
+    # every 10 days from 2024-01-01: 1, 11, 21, 31 | 10, 20 | 1, 11, 21, 31
+    assert db.expand_occurrences("2024-01", "day", 10, "2024-01", "2024-03") == {
+        "2024-01": 4, "2024-02": 2, "2024-03": 4,
+    }
+
+
+def test_expansion_from_a_later_month_skips_ahead(fresh_db):
+    db = fresh_db
+    assert db.expand_occurrences("2024-01", "week", 1, "2024-04", "2024-04") == {"2024-04": 5}
+    assert db.expand_occurrences("2024-01", "day", 10, "2024-02", "2024-02") == {"2024-02": 2}
+    # the last representable weeks don't overflow date.max
+    assert db.expand_occurrences("9999-12", "week", 1, "9999-12", "9999-12") == {"9999-12": 5}
+
+
+def test_monthly_intervals_are_anchored_on_the_start_month(fresh_db):
+    db = fresh_db
+    quarterly = db.expand_occurrences("2024-02", "month", 3, "2024-01", "2024-12")
+    assert quarterly == {"2024-02": 1, "2024-05": 1, "2024-08": 1, "2024-11": 1}
+    assert db.expand_occurrences("2024-02", "month", 3, "2024-06", "2024-12") == {"2024-08": 1, "2024-11": 1}
+    assert db.expand_occurrences("2023-07", "year", 1, "2024-01", "2025-12") == {"2024-07": 1, "2025-07": 1}
+
+
+def test_invalid_recurrence_is_rejected(fresh_db):
+    db = fresh_db
+    with pytest.raises(ValueError):
+        db.expand_occurrences("2024-01", "fortnight", 1, "2024-01", "2024-12")
+    with pytest.raises(ValueError):
+        db.add_fixed_expense("Gym", 2500, "Health", "2024-01", None, "week", 0)
+    assert db.list_fixed_expenses() == []
+
+
+def test_end_month_clips_the_schedule(fresh_db):
+    db = fresh_db
+    db.add_fixed_expense("Lease", 10000, "Car", "2024-01", "2024-03")
+    assert db.fixed_totals_for_month_range("2023-12", "2024-04") == {
+        "2024-01": 10000, "2024-02": 10000, "2024-03": 10000,
+    }
+    assert db.fixed_total_for_month("2024-04") == 0
+
+
+def _scheduled_months(db):
+    with db.get_connection() as conn:
+        return [r[0] for r in conn.execute("SELECT DISTINCT month FROM fixed_schedule ORDER BY month;")]
+
+
+def test_months_past_the_horizon_are_computed_not_written(fresh_db):
+    db = fresh_db
+    this_month = date.today().isoformat()[:7]
+    horizon = db.add_months(this_month, db.SCHEDULE_HORIZON_MONTHS)
+    db.add_fixed_expense("Rent", 150000, "Rent", this_month, None)
+    assert _scheduled_months(db)[-1] == horizon
+
+    beyond = db.add_months(horizon, 12)
+    assert db.fixed_total_for_month(beyond) == 150000
+    assert db.fixed_category_totals_for_month(beyond) == [("Rent", 150000)]
+    totals = db.fixed_totals_for_month_range(db.add_months(horizon, -1), db.add_months(horizon, 2))
+    assert list(totals.values()) == [150000] * 4
+    assert db.fixed_total_for_month("9999-12") == 150000
+    assert _scheduled_months(db)[-1] == horizon
+
+
+def test_init_db_advances_a_stale_horizon(fresh_db):
+    db = fresh_db
+    this_month = date.today().isoformat()[:7]
+    db.add_fixed_expense("Gym", 2500, "Health", db.add_months(this_month, -30), None, "week", 1)
+    with db.get_connection() as conn:
+        stale = db.add_months(this_month, -1)
+        conn.execute("DELETE FROM fixed_schedule WHERE month > ?;", (stale,))
+        conn.execute("UPDATE settings SET value = ? WHERE key = 'fixed_schedule_horizon';", (stale,))
+        conn.commit()
+
+    # still answered (on the fly) before the horizon moves
+    assert db.fixed_total_for_month(this_month) > 0
+
+    db.init_db()
+    horizon = db.add_months(this_month, db.SCHEDULE_HORIZON_MONTHS)
+    assert _scheduled_months(db)[-1] == horizon
+    assert db.fixed_total_for_month(this_month) == 2500 * sum(
+        db.expand_occurrences(db.add_months(this_month, -30), "week", 1, this_month, this_month).values())